@@ -9,6 +9,8 @@ from datetime import datetime, timezone
 import uuid
 import os
 
+from utils.tracing import span
+
 router = APIRouter()
 
 # OAuth Setup
@@ -34,16 +36,19 @@ def get_db():
 @router.get("/login")
 async def login(request: Request):
     redirect_uri = os.getenv("BACKEND_URL") + "/auth/callback"
-    return await oauth.google.authorize_redirect(request, redirect_uri)
+    with span("oauth.authorize_redirect"):
+        return await oauth.google.authorize_redirect(request, redirect_uri)
 
 @router.get("/auth/callback")
 async def auth_callback(request: Request):
     try:
-        token = await oauth.google.authorize_access_token(request)
+        with span("oauth.authorize_access_token"):
+            token = await oauth.google.authorize_access_token(request)
         userinfo = token["userinfo"]
 
         db = SessionLocal()
-        user = db.query(User).filter(User.email == userinfo["email"]).first()
+        with span("db.user_lookup"):
+            user = db.query(User).filter(User.email == userinfo["email"]).first()
 
         if not user:
             # Create new user in DB
@@ -57,9 +62,10 @@ async def auth_callback(request: Request):
                 updated_at=datetime.now(timezone.utc),
                 last_login=datetime.now(timezone.utc)
             )
-            db.add(new_user)
-            db.commit()
-            db.refresh(new_user)
+            with span("db.commit", table="users"):
+                db.add(new_user)
+                db.commit()
+                db.refresh(new_user)
             user = new_user
 
         # ✅ Store user_id in session
@@ -81,7 +87,8 @@ async def me(request: Request, db: Session = Depends(get_db)):
     if not session_user:
         return JSONResponse({"error": "Not logged in"}, status_code=401)
 
-    user = db.query(User).filter(User.email == session_user["email"]).first()
+    with span("db.user_lookup"):
+        user = db.query(User).filter(User.email == session_user["email"]).first()
     if not user:
         return JSONResponse({"error": "User not found in database"}, status_code=404)
 
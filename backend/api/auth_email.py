@@ -8,6 +8,8 @@ from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 import uuid
 
+from utils.tracing import span
+
 router = APIRouter()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -31,11 +33,13 @@ def get_db():
 # --- Register Endpoint ---
 @router.post("/register")
 async def register_user(data: RegisterRequest, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == data.email).first()
+    with span("db.user_lookup"):
+        existing = db.query(User).filter(User.email == data.email).first()
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_pw = pwd_context.hash(data.password)
+    with span("password.hash"):
+        hashed_pw = pwd_context.hash(data.password)
 
     new_user = User(
         user_id=uuid.uuid4(),
@@ -48,17 +52,21 @@ async def register_user(data: RegisterRequest, db: Session = Depends(get_db)):
         updated_at=datetime.now(timezone.utc)
     )
 
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    with span("db.commit", table="users"):
+        db.add(new_user)
+        db.commit()
+        db.refresh(new_user)
 
     return {"message": "Registration successful"}
 
 # --- Login Endpoint ---
 @router.post("/login")
 async def login_user(request: Request, data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email).first()
-    if not user or not pwd_context.verify(data.password, user.password_hash):
+    with span("db.user_lookup"):
+        user = db.query(User).filter(User.email == data.email).first()
+    with span("password.verify"):
+        valid = bool(user) and pwd_context.verify(data.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     request.session["user"] = {"email": user.email}
@@ -0,0 +1,112 @@
+import os
+from uuid import uuid4
+
+from fastapi import APIRouter, UploadFile, File, Form, Request, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from api.routes import temp_dir, get_db, get_session_user
+from services.admission import MAX_CUES_PER_FILE
+from services.cues import CueTable
+from utils.tracing import span
+
+router = APIRouter()
+
+
+async def retime_upload(request: Request, db: Session, file: UploadFile, operation: str, apply):
+    try:
+        base_name, file_ext = os.path.splitext(os.path.basename(file.filename))
+        if file_ext.lower() not in (".srt", ".vtt"):
+            return JSONResponse(status_code=400, content={"error": "Unsupported file format. Please upload .srt or .vtt"})
+
+        user, error = get_session_user(request, db)
+        if error:
+            return error
+
+        with span("parse", format=file_ext.lower()) as attrs:
+            table = CueTable.parse((await file.read()).decode("utf-8"))
+            attrs["cues"] = len(table)
+        if not len(table):
+            return JSONResponse(status_code=400, content={"error": "No subtitle cues found in file."})
+        if len(table) > MAX_CUES_PER_FILE:
+            return JSONResponse(
+                status_code=413,
+                content={"error": f"File has {len(table)} cues; the maximum is {MAX_CUES_PER_FILE}."}
+            )
+
+        with span("retime", operation=operation):
+            apply(table)
+
+        # temp_dir is shared by every user and worker, so each result gets its
+        # own directory instead of a path built from the client's filename
+        output_dir = f"retime-{uuid4().hex}"
+        output_filename = f"{base_name} (Retimed){file_ext}"
+        with span("compose", format=file_ext.lower()):
+            os.makedirs(os.path.join(temp_dir, output_dir))
+            with open(os.path.join(temp_dir, output_dir, output_filename), "w", encoding="utf-8") as f:
+                f.write(table.compose(file_ext))
+
+        return {
+            "original_filename": file.filename,
+            "retimed_filename": output_filename,
+            "download_path": f"{output_dir}/{output_filename}",
+            "operation": operation,
+            "cues": len(table),
+            "message": "File retimed successfully."
+        }
+
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": f"Internal server error: {str(e)}"})
+
+
+# Move every cue by a fixed offset (negative to show subtitles earlier)
+@router.post("/retime/shift")
+async def retime_shift(
+    request: Request, file: UploadFile = File(...), offset_ms: int = Form(...), db: Session = Depends(get_db)
+):
+    return await retime_upload(request, db, file, "shift", lambda table: table.shift(offset_ms))
+
+
+# Convert timings made for one frame rate to another (e.g. 23.976 -> 25)
+@router.post("/retime/fps")
+async def retime_fps(
+    request: Request,
+    file: UploadFile = File(...),
+    from_fps: float = Form(...),
+    to_fps: float = Form(...),
+    db: Session = Depends(get_db)
+):
+    if from_fps <= 0 or to_fps <= 0:
+        return JSONResponse(status_code=400, content={"error": "Frame rates must be positive."})
+    return await retime_upload(request, db, file, "fps", lambda table: table.convert_fps(from_fps, to_fps))
+
+
+# Two-point linear resync: map two known source times onto their correct times
+@router.post("/retime/resync")
+async def retime_resync(
+    request: Request,
+    file: UploadFile = File(...),
+    first_source_ms: int = Form(...),
+    first_target_ms: int = Form(...),
+    second_source_ms: int = Form(...),
+    second_target_ms: int = Form(...),
+    db: Session = Depends(get_db)
+):
+    return await retime_upload(
+        request, db, file, "resync",
+        lambda table: table.resync(first_source_ms, first_target_ms, second_source_ms, second_target_ms)
+    )
+
+
+# Sort cues and fix overlaps, gaps below min_gap_ms and cues shorter than min_duration_ms
+@router.post("/retime/repair")
+async def retime_repair(
+    request: Request,
+    file: UploadFile = File(...),
+    min_gap_ms: int = Form(0),
+    min_duration_ms: int = Form(0),
+    db: Session = Depends(get_db)
+):
+    return await retime_upload(request, db, file, "repair", lambda table: table.repair(min_gap_ms, min_duration_ms))
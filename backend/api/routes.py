@@ -1,26 +1,38 @@
 import os
+import asyncio
 import httpx
-import tempfile
-import time
+import json
+import shutil
 
 from fastapi import APIRouter, UploadFile, File, Form, Query, Request, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from typing import Dict, Optional, List
 from dotenv import load_dotenv
 from pydantic import BaseModel
 
-from database.models import SubtitleFile, User
-from database.models import Translation
+from database.models import User, SubtitleFile, Translation, TranslationChunk
 from database.db import SessionLocal
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from uuid import uuid4
-from datetime import datetime, timezone
+from uuid import UUID, uuid4
 
-import srt
-import webvtt
 import zipfile
 import io
 
+from services.admission import MAX_CUES_PER_FILE
+from services.checkpoints import ChunkCheckpoint, release_upload, remove_files
+from services.scheduler import scheduler, user_weight, BULK
+from services.search import cue_rows, index_cues
+from services.translation import (
+    AZURE_TRANSLATOR_ENDPOINT, AZURE_SUBSCRIPTION_KEY, AZURE_REGION,
+    CuePlan, translate_cues, translated_filename, parse_subtitles, write_subtitles, cue_timings, translation_records,
+    original_record, pending_translation_records,
+)
+from config import settings
+from utils.tracing import span
+from utils.zipstream import stream_zip
+
 
 class ZipRequest(BaseModel):
     filenames: List[str]
@@ -29,7 +41,9 @@ load_dotenv()
 
 router = APIRouter()
 
-temp_dir = tempfile.mkdtemp()
+# Shared by every worker process, so a file translated by one worker can be downloaded through another.
+# Created at application startup.
+temp_dir = settings.STORAGE_DIR
 
 # --- DB Dependency ---
 def get_db():
@@ -40,15 +54,9 @@ def get_db():
         db.close()
 
 
-AZURE_TRANSLATOR_ENDPOINT = os.getenv("AZURE_TRANSLATOR_ENDPOINT")
-AZURE_SUBSCRIPTION_KEY = os.getenv("AZURE_SUBSCRIPTION_KEY")
-AZURE_REGION = os.getenv("AZURE_REGION")
 AZURE_LANGUAGES_URL = os.getenv("AZURE_LANGUAGES_URL")
 
-if not AZURE_SUBSCRIPTION_KEY or not AZURE_REGION:
-    raise EnvironmentError("Missing AZURE_SUBSCRIPTION_KEY or AZURE_REGION in environment.")
-
-MAX_CHAR_LIMIT = 20000  # Azure limit is 50000 characters per request
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", "100"))
 
 
 def fetch_language_codes() -> Dict[str, str]:
@@ -73,94 +81,34 @@ def fetch_language_codes() -> Dict[str, str]:
         return {}
 
 
-def post_with_retries(url, headers, json_body, retries=14):
-    for i in range(retries):
-        response = httpx.post(url, headers=headers, json=json_body)
-        if response.status_code == 429:
-            wait = 5
-            print(f"Rate limited. Retrying in {wait} seconds...")
-            time.sleep(wait)
-            continue
-        response.raise_for_status()
-        return response
-    raise Exception("Exceeded retry limit for translation request.")
-
-
-def chunk_texts(texts, max_chars):
-    chunks = []
-    current_chunk = []
-    current_length = 0
+# List of Languages present for translation, filled in at application startup
+LANGUAGE_CODES: Dict[str, str] = {}
 
-    for text in texts:
-        length = len(text)
-        if current_length + length > max_chars:
-            chunks.append(current_chunk)
-            current_chunk = [text]
-            current_length = length
-        else:
-            current_chunk.append(text)
-            current_length += length
 
-    if current_chunk:
-        chunks.append(current_chunk)
+def load_language_codes():
+    LANGUAGE_CODES.update(fetch_language_codes())
 
-    return chunks
-
-
-def detect_and_translate(texts, to_lang, no_prof):
-    path = "/translate?api-version=3.0"
-    params = f"&to={to_lang}"
-    if no_prof:
-        params += "&profanityAction=Marked"
-    url = AZURE_TRANSLATOR_ENDPOINT.rstrip('/') + path + params
-    headers = {
-        "Ocp-Apim-Subscription-Key": AZURE_SUBSCRIPTION_KEY,
-        "Ocp-Apim-Subscription-Region": AZURE_REGION,
-        "Content-Type": "application/json; charset=UTF-8",
-    }
-
-    translated = []
-    count = 1
-    total_chunks = chunk_texts(texts, MAX_CHAR_LIMIT)
-    for chunk in total_chunks:
-        body = [{"Text": t} for t in chunk]
-        try:
-            # print("\nSource Chunk", count, ":", body)
-            print("Translating Chunk", count, "of", len(total_chunks))
-            response = post_with_retries(url, headers, body)
-            data = response.json()
-            translated.extend([item["translations"][0]["text"] for item in data])
-            count += 1
-        except httpx.HTTPStatusError as e:
-            print("Status Code:", e.response.status_code)
-            print("Response Text:", e.response.text)
-            raise e
-        except Exception as ex:
-            print("Translation Error:", ex)
-            raise ex
-
-    # print("\nTranslated Output:", translated)
-    return translated
-
-
-# List of Languages present for translation
-LANGUAGE_CODES = fetch_language_codes()
 
 # Endpoint to get the supported languages
 @router.get("/languages")
 def get_languages() -> Dict[str, str]:
+    if not LANGUAGE_CODES:
+        # Startup fetch failed (e.g. Azure unreachable); try again on demand
+        load_language_codes()
     return LANGUAGE_CODES
 
 
 # Check internal environment setup, not make external calls
 @router.get("/health")
-def health_check():
+def health_check(request: Request):
     return {
         "status": "ok",
         "message": "Backend is up. Azure Translator assumed reachable.",
         "azure_key_configured": bool(AZURE_SUBSCRIPTION_KEY),
         "azure_endpoint_configured": bool(AZURE_TRANSLATOR_ENDPOINT),
         "azure_region_configured": bool(AZURE_REGION),
+        "translation_scheduler": scheduler.stats(),
+        "admission": request.app.state.admission.stats() if hasattr(request.app.state, "admission") else None,
     }
 
 # Only invoke manually for debugging
@@ -235,6 +183,88 @@ def debug_translator():
         )
 
 
+def get_session_user(request: Request, db: Session):
+    session_user = request.session.get("user")
+    if not session_user or not session_user.get("email"):
+        return None, JSONResponse(status_code=401, content={"error": "User not authenticated"})
+
+    with span("db.user_lookup"):
+        user = db.query(User).filter(User.email == session_user["email"]).first()
+    if not user:
+        return None, JSONResponse(status_code=404, content={"error": "User not found"})
+    return user, None
+
+
+# Translate the source file of a pending translation, checkpointing every
+# Azure chunk, then write the output and record it. Shared by upload-file and
+# resume; on resume only chunks without a checkpoint are sent to Azure.
+async def finish_translation(db: Session, user, translation: Translation, original: SubtitleFile, document, texts):
+    file_ext = os.path.splitext(original.original_file_name)[1]
+    target_language = translation.target_language
+    censor_profanity = translation.has_profanity
+    output_filename = translated_filename(original.original_file_name, target_language, censor_profanity)
+    output_path = os.path.join(temp_dir, output_filename)
+
+    checkpoint = await run_in_threadpool(ChunkCheckpoint, translation.translation_id)
+    with span("translate", checkpointed_chunks=len(checkpoint)):
+        translated, stats = await run_in_threadpool(
+            translate_cues, texts, target_language, censor_profanity,
+            user_key=str(user.user_id), weight=user_weight(user), checkpoint=checkpoint
+        )
+    # Writing the file, indexing up to MAX_CUES_PER_FILE cues and committing
+    # all block, so they run in the threadpool rather than on the event loop
+    def save_output():
+        with span("compose", format=file_ext.lower()):
+            starts, ends = cue_timings(document, file_ext)
+            write_subtitles(document, file_ext, translated, output_path)
+
+        # Saving the metadata in subtitle_files and translations tables
+        with span("db.commit", tables="subtitle_files,translations,subtitle_cues,translation_chunks"):
+            # A concurrent resume of the same translation may have recorded it already
+            db.refresh(translation, with_for_update=True)
+            input_path = None
+            if translation.translation_status == "pending":
+                translated_file, _ = translation_records(
+                    user, output_filename, output_path, file_ext, target_language, censor_profanity, translation=translation
+                )
+                db.add(translated_file)
+                index_cues(db, cue_rows(translated_file, target_language, starts, ends, translated))
+                checkpoint.clear(db)
+                input_path = release_upload(original)
+            db.commit()
+        return input_path
+
+    input_path = await run_in_threadpool(save_output)
+
+    # The uploaded source is only kept for as long as a resume may need it
+    remove_files([input_path])
+    return output_filename, stats
+
+
+def translation_response(original: SubtitleFile, translation: Translation, output_filename, stats, message):
+    return {
+        "original_filename": original.original_file_name,
+        "translated_filename": output_filename,
+        "translation_id": str(translation.translation_id),
+        "target_language": translation.target_language,
+        "target_language_name": LANGUAGE_CODES.get(translation.target_language),
+        "characters_saved": stats["characters_saved"],
+        "cues_sent": stats["unique_cues"],
+        "chunks_resumed": stats["resumed_chunks"],
+        "message": message
+    }
+
+
+def resumable_error(translation_id, e: Exception):
+    return JSONResponse(
+        status_code=500,
+        content={
+            "error": f"Internal server error: {str(e)}",
+            "translation_id": translation_id,
+            "resume_url": f"/api/translations/{translation_id}/resume",
+        })
+
+
 # Uploading the .srt or .vtt file and selecting target language(s)
 @router.post("/upload-file")
 async def upload_file(
@@ -244,98 +274,331 @@ async def upload_file(
     censor_profanity: bool = Form(...),
     db: Session = Depends(get_db)
 ):
+    translation_id = None
+    input_path = None
     try:
-        input_path = os.path.join(temp_dir, file.filename)
-        base_name, file_ext = os.path.splitext(file.filename)
-        tag = " and Censored" if censor_profanity else ""
-        output_filename = f"{base_name} (Translated to {target_language.upper()}{tag}){file_ext}"
-        output_path = os.path.join(temp_dir, output_filename)
+        file_ext = os.path.splitext(file.filename)[1]
+        # Kept under a unique name for as long as the translation might be resumed
+        input_path = os.path.join(temp_dir, f"upload-{uuid4().hex}{file_ext}")
 
-        with open(input_path, "wb") as f:
-            f.write(await file.read())
+        # Get user from session before spending any translation quota
+        user, error = get_session_user(request, db)
+        if error:
+            return error
+
+        with span("upload.read") as attrs:
+            content = await file.read()
+            attrs["bytes"] = len(content)
+            with open(input_path, "wb") as f:
+                f.write(content)
 
         # Translation logic
-        if file_ext.lower() == ".srt":
-            with open(input_path, "r", encoding="utf-8") as f:
-                subtitles = list(srt.parse(f.read()))
-            texts = [s.content for s in subtitles]
-            translated = detect_and_translate(texts, target_language, censor_profanity)
-            for i, s in enumerate(subtitles):
-                s.content = translated[i]
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(srt.compose(subtitles))
-
-        elif file_ext.lower() == ".vtt":
-            vtt = webvtt.read(input_path)
-            texts = [caption.text for caption in vtt.captions]
-            translated = detect_and_translate(texts, target_language, censor_profanity)
-            for i, caption in enumerate(vtt.captions):
-                caption.text = translated[i]
-            vtt.save(output_path)
-        else:
-            raise ValueError("Unsupported file format. Please upload .srt or .vtt")
-
-        # Get user from session
-        session_user = request.session.get("user")
-        if not session_user or not session_user.get("email"):
-            return JSONResponse(status_code=401, content={"error": "User not authenticated"})
-
-        user_email = session_user["email"]
-        user = db.query(User).filter(User.email == user_email).first()
-        if not user:
-            return JSONResponse(status_code=404, content={"error": "User not found"})
-
-        # Saving the metadata of subtitle files in subtitle_files table
-        translated_subtitle = SubtitleFile(
-            file_id=uuid4(),
-            project_id=None,
-            user_id=user.user_id,
-            original_file_name=output_filename,
-            storage_path=output_path,
-            file_format=file_ext.lower().replace(".", ""),
-            file_size_bytes=os.path.getsize(output_path),
-            is_original=False,
-            is_public=False,
-            has_profanity=censor_profanity,
-            source_language="auto",
-            created_at=datetime.now(timezone.utc)
+        with span("parse", format=file_ext.lower()) as attrs:
+            document, texts = parse_subtitles(input_path, file_ext)
+            attrs["cues"] = len(texts)
+        if len(texts) > MAX_CUES_PER_FILE:
+            remove_files([input_path])
+            return JSONResponse(
+                status_code=413,
+                content={"error": f"File has {len(texts)} cues; the maximum is {MAX_CUES_PER_FILE}."}
+            )
+
+        with span("db.commit", tables="subtitle_files,translations"):
+            original, translation = pending_translation_records(
+                user, file.filename, input_path, file_ext, target_language, censor_profanity
+            )
+            db.add_all((original, translation))
+            db.commit()
+        translation_id = str(translation.translation_id)
+
+        output_filename, stats = await finish_translation(db, user, translation, original, document, texts)
+        return translation_response(
+            original, translation, output_filename, stats, "File uploaded, translated, and saved successfully."
         )
-        db.add(translated_subtitle)
-        db.commit()
-
-        # Saving the translated subtitle files metadata in translations table
-        translation = Translation(
-            translation_id=uuid4(),
-            file_id=translated_subtitle.file_id,
-            translated_file_id=translated_subtitle.file_id,
-            source_language="auto",
-            target_language=target_language,
-            translation_status="completed",
-            translation_service="azure",
-            requested_at=datetime.now(timezone.utc),
-            completed_at=datetime.now(timezone.utc),
-            has_profanity=censor_profanity,
-            translation_cost=None,
-            manual_edits_count=0,
-            last_edited_by_user_id=user.user_id,
-            last_edited_at=None
+
+    except Exception as e:
+        db.rollback()
+        if translation_id:
+            return resumable_error(translation_id, e)
+        # No pending translation points at the input yet, so nothing else
+        # would ever delete it
+        remove_files([input_path])
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Internal server error: {str(e)}"})
+
+
+# The signed-in user's translations, newest first. A client whose upload-file
+# request was cut off (e.g. the worker restarted) finds its translation_id
+# here with ?status=pending and resumes it.
+@router.get("/translations")
+def list_translations(
+    request: Request,
+    status: Optional[str] = Query(None, description="pending, completed or expired"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    try:
+        user, error = get_session_user(request, db)
+        if error:
+            return error
+
+        query = (
+            db.query(Translation, SubtitleFile)
+            .join(SubtitleFile, SubtitleFile.file_id == Translation.file_id)
+            .filter(SubtitleFile.user_id == user.user_id)
         )
-        db.add(translation)
-        db.commit()
+        if status:
+            query = query.filter(Translation.translation_status == status)
+        rows = query.order_by(Translation.requested_at.desc()).limit(limit).all()
+
+        chunk_counts = dict(
+            db.query(TranslationChunk.translation_id, func.count())
+            .filter(TranslationChunk.translation_id.in_([t.translation_id for t, _ in rows]))
+            .group_by(TranslationChunk.translation_id)
+            .all()
+        ) if rows else {}
+
+        return {
+            "translations": [
+                {
+                    "translation_id": str(translation.translation_id),
+                    # Rows recorded before originals were kept point at the translated file
+                    "original_filename": original.original_file_name if original.is_original else None,
+                    "target_language": translation.target_language,
+                    "status": translation.translation_status,
+                    "requested_at": translation.requested_at.isoformat() if translation.requested_at else None,
+                    "completed_at": translation.completed_at.isoformat() if translation.completed_at else None,
+                    "checkpointed_chunks": chunk_counts.get(translation.translation_id, 0),
+                    "resume_url": (
+                        f"/api/translations/{translation.translation_id}/resume"
+                        if translation.translation_status == "pending" else None
+                    ),
+                }
+                for translation, original in rows
+            ]
+        }
+
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Internal server error: {str(e)}"})
+
+
+# Finish a translation whose upload-file request failed part way; chunks
+# translated before the failure are reused, so only the rest are billed
+@router.post("/translations/{translation_id}/resume")
+async def resume_translation(translation_id: UUID, request: Request, db: Session = Depends(get_db)):
+    try:
+        user, error = get_session_user(request, db)
+        if error:
+            return error
+
+        translation = db.get(Translation, translation_id)
+        original = db.get(SubtitleFile, translation.file_id) if translation else None
+        if not original or original.user_id != user.user_id:
+            return JSONResponse(status_code=404, content={"error": "Translation not found"})
+        if translation.translation_status == "expired":
+            return JSONResponse(status_code=410, content={"error": "Translation expired. Please upload the file again."})
+        if translation.translation_status != "pending":
+            return JSONResponse(status_code=409, content={"error": f"Translation is already {translation.translation_status}."})
+        if not original.storage_path or not os.path.exists(original.storage_path):
+            return JSONResponse(status_code=410, content={"error": "The uploaded file is no longer available. Please upload it again."})
+
+        file_ext = os.path.splitext(original.original_file_name)[1]
+        with span("parse", format=file_ext.lower()) as attrs:
+            document, texts = parse_subtitles(original.storage_path, file_ext)
+            attrs["cues"] = len(texts)
+
+        output_filename, stats = await finish_translation(db, user, translation, original, document, texts)
+        return translation_response(original, translation, output_filename, stats, "Translation resumed and saved successfully.")
+
+    except Exception as e:
+        db.rollback()
+        return resumable_error(str(translation_id), e)
+
+
+# "name.srt", then "name (2).srt", ... for names already in `taken`
+def unique_filename(filename, taken):
+    base_name, file_ext = os.path.splitext(filename)
+    candidate = filename
+    n = 2
+    while candidate in taken:
+        candidate = f"{base_name} ({n}){file_ext}"
+        n += 1
+    taken.add(candidate)
+    return candidate
+
+
+# Uploading many .srt/.vtt files at once; cues from every file are packed
+# into shared Azure chunks and the results come back as one bundle
+@router.post("/upload-batch")
+async def upload_batch(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    target_language: str = Form(...),
+    censor_profanity: bool = Form(...),
+    db: Session = Depends(get_db)
+):
+    input_paths = []
+    bundle_dir = None
+    completed = False
+    try:
+        if len(files) > MAX_BATCH_FILES:
+            return JSONResponse(status_code=400, content={"error": f"A batch can contain at most {MAX_BATCH_FILES} files."})
+        for file in files:
+            if os.path.splitext(file.filename)[1].lower() not in (".srt", ".vtt"):
+                return JSONResponse(status_code=400, content={"error": f"Unsupported file format: {file.filename}. Please upload .srt or .vtt"})
+
+        user, error = get_session_user(request, db)
+        if error:
+            return error
+
+        # Inputs and outputs never use client-supplied names as paths: temp_dir is
+        # shared by every user and worker, and one batch may repeat a filename
+        bundle_id = uuid4().hex
+        bundle_dir = os.path.join(temp_dir, f"bundle-{bundle_id}")
+        manifest_path = os.path.join(temp_dir, f"bundle-{bundle_id}.json")
+        os.makedirs(bundle_dir)
+
+        with span("upload.read", files=len(files)) as attrs:
+            total_bytes = 0
+            sizes = []
+            for file in files:
+                content = await file.read()
+                total_bytes += len(content)
+                sizes.append(len(content))
+                input_path = os.path.join(temp_dir, f"upload-{uuid4().hex}{os.path.splitext(file.filename)[1]}")
+                with open(input_path, "wb") as f:
+                    f.write(content)
+                input_paths.append(input_path)
+            attrs["bytes"] = total_bytes
+
+        with span("parse", files=len(files)) as attrs:
+            parsed = await asyncio.gather(*[
+                run_in_threadpool(parse_subtitles, path, os.path.splitext(path)[1]) for path in input_paths
+            ])
+            attrs["cues"] = sum(len(texts) for _, texts in parsed)
+        for file, (_, texts) in zip(files, parsed):
+            if len(texts) > MAX_CUES_PER_FILE:
+                return JSONResponse(
+                    status_code=413,
+                    content={"error": f"{file.filename} has {len(texts)} cues; the maximum is {MAX_CUES_PER_FILE}."}
+                )
+
+        # One flat cue list, so the final chunk of one file is filled with cues of the next
+        all_texts = []
+        offsets = []
+        for _, texts in parsed:
+            offsets.append((len(all_texts), len(all_texts) + len(texts)))
+            all_texts.extend(texts)
+
+        plan = await run_in_threadpool(CuePlan, all_texts)
+        with span("translate"):
+            translated, stats = await run_in_threadpool(
+                translate_cues, all_texts, target_language, censor_profanity,
+                user_key=str(user.user_id), weight=user_weight(user), lane=BULK, plan=plan
+            )
+
+        outputs = []
+        taken = set()
+        with span("compose", files=len(files)):
+            jobs = []
+            for file, (document, _), (start, end), size in zip(files, parsed, offsets, sizes):
+                file_ext = os.path.splitext(file.filename)[1]
+                output_filename = unique_filename(
+                    translated_filename(os.path.basename(file.filename), target_language, censor_profanity), taken
+                )
+                output_path = os.path.join(bundle_dir, output_filename)
+                outputs.append((file.filename, output_filename, output_path, file_ext, plan.characters_saved(start, end), size))
+                jobs.append(run_in_threadpool(write_subtitles, document, file_ext, translated[start:end], output_path))
+            # Let every write finish before raising, so none lands after the cleanup below
+            for result in await asyncio.gather(*jobs, return_exceptions=True):
+                if isinstance(result, Exception):
+                    raise result
+
+        def record_outputs():
+            with span("db.commit", tables="subtitle_files,translations,subtitle_cues"):
+                for (filename, output_filename, output_path, file_ext, _, size), (document, _), (start, end) in zip(
+                    outputs, parsed, offsets
+                ):
+                    # The source isn't kept (batches aren't resumable), only its row
+                    original = original_record(user, filename, file_ext, None, size)
+                    translated_file, translation = translation_records(
+                        user, output_filename, output_path, file_ext, target_language, censor_profanity, original=original
+                    )
+                    db.add_all((original, translated_file, translation))
+                    starts, ends = cue_timings(document, file_ext)
+                    index_cues(db, cue_rows(translated_file, target_language, starts, ends, translated[start:end]))
+                db.commit()
+
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump([output_filename for _, output_filename, _, _, _, _ in outputs], f)
+        await run_in_threadpool(record_outputs)
+        completed = True
 
         return {
-            "original_filename": file.filename,
-            "translated_filename": output_filename,
+            "bundle_id": bundle_id,
+            "files": [
+                {
+                    "original_filename": original,
+                    "translated_filename": output_filename,
+                    "download_path": f"bundle-{bundle_id}/{output_filename}",
+                    "characters_saved": characters_saved,
+                }
+                for original, output_filename, _, _, characters_saved, _ in outputs
+            ],
             "target_language": target_language,
             "target_language_name": LANGUAGE_CODES.get(target_language),
-            "message": "File uploaded, translated, and saved successfully."
+            "characters_saved": stats["characters_saved"],
+            "cues_sent": stats["unique_cues"],
+            "message": f"{len(outputs)} files uploaded, translated, and saved successfully."
         }
 
     except Exception as e:
+        db.rollback()
         return JSONResponse(
             status_code=500,
             content={"error": f"Internal server error: {str(e)}"})
 
+    finally:
+        # Batches aren't resumable, so the uploads are only needed for parsing
+        remove_files(input_paths)
+        # Nothing records a failed batch, so its partial outputs could never be downloaded
+        if bundle_dir and not completed:
+            shutil.rmtree(bundle_dir, ignore_errors=True)
+            remove_files([manifest_path])
+
+
+# Stream every translated file of a batch upload as one ZIP
+@router.get("/download-bundle/{bundle_id}")
+def download_bundle(bundle_id: str):
+    try:
+        manifest_path = os.path.join(temp_dir, f"bundle-{os.path.basename(bundle_id)}.json")
+        if not os.path.exists(manifest_path):
+            return JSONResponse(status_code=404, content={"error": "Requested bundle not found."})
+
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            filenames = json.load(f)
+
+        bundle_dir = os.path.join(temp_dir, f"bundle-{os.path.basename(bundle_id)}")
+        paths = [(os.path.join(bundle_dir, filename), filename) for filename in filenames]
+        missing = [filename for path, filename in paths if not os.path.exists(path)]
+        if missing:
+            return JSONResponse(status_code=404, content={"error": f"File {missing[0]} not found"})
+
+        return StreamingResponse(
+            stream_zip(paths),
+            media_type="application/zip",
+            headers={"Content-Disposition": f"attachment; filename=translated_subtitles_{bundle_id}.zip"}
+        )
+
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Error creating ZIP file: {str(e)}"}
+        )
+
 
 # Download subtitle file by dynamic name
 @router.get("/download-subtitle")
@@ -349,11 +612,13 @@ def download_subtitle(filename: str = Query(..., description="Name of the subtit
                 content={"error": "Requested file not found."}
             )
 
+        # Batch and retime results live in per-request directories ("retime-<id>/name.srt")
+        download_name = os.path.basename(filename)
         return FileResponse(
             path=file_path,
             media_type="application/octet-stream",
-            filename=filename,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+            filename=download_name,
+            headers={"Content-Disposition": f"attachment; filename={download_name}"}
         )
 
     except Exception as e:
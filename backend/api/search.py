@@ -0,0 +1,46 @@
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Query, Request, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from api.routes import get_db, get_session_user
+from services.search import search_cues, MAX_PAGE_SIZE
+from utils.tracing import span
+
+router = APIRouter()
+
+
+# Search the cues of the signed-in user's translated files
+@router.get("/search")
+def search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Words or phrase to find"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    language: Optional[str] = Query(None, description="Only cues translated to this language"),
+    file_id: Optional[UUID] = Query(None, description="Only cues of this file"),
+    db: Session = Depends(get_db)
+):
+    try:
+        user, error = get_session_user(request, db)
+        if error:
+            return error
+
+        with span("db.search") as attrs:
+            results, has_more = search_cues(db, user.user_id, q, page, page_size, language, file_id)
+            attrs["results"] = len(results)
+
+        return {
+            "query": q,
+            "page": page,
+            "page_size": page_size,
+            "has_more": has_more,
+            "results": results,
+        }
+
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Internal server error: {str(e)}"})
@@ -0,0 +1,198 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from database.db import SessionLocal
+from database.models import User
+from services.translation import (
+    AsyncTranslator, parse_subtitles, write_subtitles, translated_filename, translation_records,
+    original_record,
+)
+from services.search import file_cue_rows, index_cues
+
+SUBTITLE_EXTENSIONS = (".srt", ".vtt")
+
+
+# --- Process pool jobs (module level so they can be pickled) ---
+
+# Parser exceptions such as srt.SRTParseError can't be unpickled in the parent
+# and would break the whole pool, so jobs re-raise them as plain ValueErrors
+
+def _parse_texts(path):
+    try:
+        return parse_subtitles(path, os.path.splitext(path)[1])[1]
+    except Exception as e:
+        raise ValueError(f"{type(e).__name__}: {e}") from None
+
+
+def _write_output(path, output_path, translated):
+    try:
+        file_ext = os.path.splitext(path)[1]
+        document, _ = parse_subtitles(path, file_ext)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        write_subtitles(document, file_ext, translated, output_path)
+    except Exception as e:
+        raise ValueError(f"{type(e).__name__}: {e}") from None
+
+
+# --- Manifest ---
+
+def find_subtitles(source_dir):
+    found = []
+    for root, _, filenames in os.walk(source_dir):
+        for filename in filenames:
+            if os.path.splitext(filename)[1].lower() in SUBTITLE_EXTENSIONS:
+                found.append(os.path.relpath(os.path.join(root, filename), source_dir))
+    return sorted(found)
+
+
+def load_manifest(path, target_language, censor_profanity):
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["target_language"] != target_language or manifest["censor_profanity"] != censor_profanity:
+            raise SystemExit(f"Manifest {path} belongs to a different job; pass --manifest to start a new one.")
+        return manifest
+    return {"target_language": target_language, "censor_profanity": censor_profanity, "files": {}}
+
+
+def save_manifest(path, manifest):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# --- translate command ---
+
+async def translate_tree(args, manifest):
+    # Skip finished files, and earlier outputs when writing next to the sources
+    pending = [
+        rel for rel in find_subtitles(args.source)
+        if rel not in manifest["files"] and " (Translated to " not in os.path.basename(rel)
+    ]
+    print(f"{len(pending)} files to translate ({len(manifest['files'])} already done)")
+
+    loop = asyncio.get_running_loop()
+    in_progress = asyncio.Semaphore(args.workers * 2)
+    failures = []
+    done = 0
+
+    with ProcessPoolExecutor(args.workers) as pool:
+        async with AsyncTranslator(args.to, args.censor, args.concurrency, args.chars_per_minute) as translator:
+
+            async def process(rel):
+                nonlocal done
+                async with in_progress:
+                    path = os.path.join(args.source, rel)
+                    output_rel = os.path.join(os.path.dirname(rel), translated_filename(os.path.basename(rel), args.to, args.censor))
+                    try:
+                        texts = await loop.run_in_executor(pool, _parse_texts, path)
+                        translated, stats = await translator.translate(texts)
+                        await loop.run_in_executor(pool, _write_output, path, os.path.join(args.out, output_rel), translated)
+                    except Exception as e:
+                        failures.append(rel)
+                        print(f"Failed: {rel}: {e}")
+                        return
+
+                    manifest["files"][rel] = {
+                        "output": output_rel,
+                        "cues": len(texts),
+                        "characters_saved": stats["characters_saved"],
+                        "billed_chars": stats["billed_chars"],
+                        "recorded": False,
+                    }
+                    save_manifest(args.manifest, manifest)
+                    done += 1
+                    print(f"[{done}/{len(pending)}] {rel} ({len(texts)} cues, {stats['billed_chars']} chars sent)")
+
+            await asyncio.gather(*[process(rel) for rel in pending])
+
+    return failures
+
+
+# Checked before anything is translated, so a mistyped email costs no Azure quota
+def find_user(email):
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == email).first()
+    finally:
+        db.close()
+    if not user:
+        raise SystemExit(f"User {email} not found")
+    return user
+
+
+# Insert SubtitleFile/Translation rows and search index cues for every translated file not yet recorded, in one commit
+def record_results(args, manifest, user):
+    entries = [(rel, entry) for rel, entry in manifest["files"].items() if not entry["recorded"]]
+    if not entries:
+        return 0
+
+    db = SessionLocal()
+    try:
+        for rel, entry in entries:
+            source_path = os.path.abspath(os.path.join(args.source, rel))
+            output_path = os.path.abspath(os.path.join(args.out, entry["output"]))
+            file_ext = os.path.splitext(output_path)[1]
+            original = original_record(
+                user, os.path.basename(rel), file_ext, source_path,
+                os.path.getsize(source_path) if os.path.exists(source_path) else None
+            )
+            translated_file, translation = translation_records(
+                user, os.path.basename(output_path), output_path, file_ext, args.to, args.censor, original=original
+            )
+            db.add_all((original, translated_file, translation))
+            index_cues(db, file_cue_rows(translated_file, args.to))
+        db.commit()
+    finally:
+        db.close()
+
+    for _, entry in entries:
+        entry["recorded"] = True
+    save_manifest(args.manifest, manifest)
+    return len(entries)
+
+
+def run_translate(args):
+    args.out = args.out or args.source
+    args.manifest = args.manifest or os.path.join(args.out, f".translate-manifest-{args.to}.json")
+    os.makedirs(args.out, exist_ok=True)
+
+    manifest = load_manifest(args.manifest, args.to, args.censor)
+    user = find_user(args.user_email)
+    failures = asyncio.run(translate_tree(args, manifest))
+    recorded = record_results(args, manifest, user)
+
+    print(f"Recorded {recorded} translations. Manifest: {args.manifest}")
+    if failures:
+        print(f"{len(failures)} files failed; run the same command again to retry them.")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Subtitle Translator batch tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    translate = commands.add_parser("translate", help="Translate every .srt/.vtt file under a directory")
+    translate.add_argument("source", help="Directory to search for subtitle files")
+    translate.add_argument("--to", required=True, help="Target language code, e.g. fr")
+    translate.add_argument("--user-email", required=True, help="Account the translations are recorded under")
+    translate.add_argument("--out", help="Output directory (defaults to the source directory)")
+    translate.add_argument("--censor", action="store_true", help="Mark profanity in the translation")
+    translate.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for parsing and writing files")
+    translate.add_argument("--concurrency", type=int, default=4, help="Concurrent Azure requests")
+    translate.add_argument("--chars-per-minute", type=int, help="Azure character budget per minute")
+    translate.add_argument("--manifest", help="Progress manifest used to resume an interrupted run")
+    translate.set_defaults(func=run_translate)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
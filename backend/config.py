@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -7,4 +8,17 @@ class Settings:
     DATABASE_URL = os.getenv("DATABASE_URL")
     DEBUG = os.getenv("DEBUG", "false").lower() == "true"
 
+    # Request tracing and profiling
+    TRACE_ENABLED = os.getenv("TRACE_ENABLED", "true").lower() == "true"
+    TRACE_LOG_FILE = os.getenv("TRACE_LOG_FILE")
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))
+    PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+    PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+
+    # Serving
+    STORAGE_DIR = os.getenv("STORAGE_DIR", os.path.join(tempfile.gettempdir(), "subtitle-translator"))
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "0"))  # 0 = derive from CPU limits
+    GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+
 settings = Settings()
@@ -12,7 +12,58 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL is not set in .env file.")
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Connections the database allows this app in total, shared by every worker process
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "90"))
 
 Base = declarative_base()
+
+# The engine (and its connection pool) is created on first use rather than at
+# import, so a pre-forking server never shares pooled connections between workers
+engine = None
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+
+
+def pool_settings() -> dict:
+    if DATABASE_URL.startswith("sqlite"):
+        return {}
+    workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    per_worker = max(2, DB_MAX_CONNECTIONS // workers)
+    pool_size = int(os.getenv("DB_POOL_SIZE", max(1, per_worker * 2 // 3)))
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max(0, per_worker - pool_size),
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+    }
+
+
+def get_engine():
+    global engine
+    if engine is None:
+        engine = create_engine(DATABASE_URL, **pool_settings())
+        _session_factory.configure(bind=engine)
+    return engine
+
+
+def dispose_engine():
+    global engine
+    if engine is not None:
+        engine.dispose()
+        engine = None
+
+
+def SessionLocal():
+    get_engine()
+    return _session_factory()
+
+
+# A child forked after the engine exists must not reuse the parent's sockets
+def _reset_engine_after_fork():
+    global engine
+    if engine is not None:
+        engine.dispose(close=False)
+        engine = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_engine_after_fork)
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Integer, Boolean, TIMESTAMP, ForeignKey, Text, DECIMAL, BigInteger
-from sqlalchemy.dialects.postgresql import UUID as pgUUID
+from sqlalchemy import Column, String, Integer, Boolean, TIMESTAMP, ForeignKey, Text, DECIMAL, BigInteger, Computed, Index, DDL, event
+from sqlalchemy.dialects.postgresql import UUID as pgUUID, TSVECTOR
 import uuid
 from .db import Base  # Relative import
 
@@ -66,6 +66,55 @@ class Translation(Base):
     last_edited_at = Column(TIMESTAMP)
 
 
+# Translated results of one Azure chunk of a pending translation, so a failed
+# or interrupted run can be resumed without paying for finished chunks again.
+# Deleted once the translation completes.
+class TranslationChunk(Base):
+    __tablename__ = "translation_chunks"
+
+    translation_id = Column(pgUUID(as_uuid=True), ForeignKey("translations.translation_id", ondelete="CASCADE"), primary_key=True)
+    chunk_index = Column(Integer, primary_key=True)
+    source_hash = Column(String(64), nullable=False)  # sha256 of the chunk's source texts
+    translated_texts = Column(Text, nullable=False)  # JSON list, one entry per source text
+    created_at = Column(TIMESTAMP)
+
+
+# One row per cue of a translated file, so searches never have to open the
+# files under storage_path. The 'simple' text search configuration is used
+# because cues are in whatever language they were translated to; the trigram
+# index covers substring matches that word search misses.
+class SubtitleCue(Base):
+    __tablename__ = "subtitle_cues"
+
+    cue_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    file_id = Column(pgUUID(as_uuid=True), ForeignKey("subtitle_files.file_id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(pgUUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)  # copied from the file so searches skip the join
+    cue_index = Column(Integer, nullable=False)
+    start_ms = Column(BigInteger)
+    end_ms = Column(BigInteger)
+    language = Column(String(20))
+    content = Column(Text, nullable=False)
+    search_vector = Column(TSVECTOR, Computed("to_tsvector('simple', content)", persisted=True))
+
+    # user_id is part of both GIN indexes (btree_gin), so a common word is
+    # looked up within one user's cues instead of matching every user's first
+    __table_args__ = (
+        Index("ix_subtitle_cues_user_search_vector", "user_id", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_subtitle_cues_user_content_trgm", "user_id", "content",
+            postgresql_using="gin", postgresql_ops={"content": "gin_trgm_ops"},
+        ),
+        Index("ix_subtitle_cues_file_cue", "file_id", "cue_index"),
+    )
+
+
+for extension in ("pg_trgm", "btree_gin"):
+    event.listen(
+        SubtitleCue.__table__, "before_create",
+        DDL(f"CREATE EXTENSION IF NOT EXISTS {extension}").execute_if(dialect="postgresql"),
+    )
+
+
 class LiveSession(Base):
     __tablename__ = "live_sessions"
 
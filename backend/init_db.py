@@ -1,4 +1,4 @@
-from database.db import engine
+from database.db import get_engine
 from database.models import Base
 from dotenv import load_dotenv
 import os
@@ -6,5 +6,5 @@ import os
 # Load .env from current directory
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
 
-Base.metadata.create_all(bind = engine)
+Base.metadata.create_all(bind = get_engine())
 print("Tables created successfully")
\ No newline at end of file
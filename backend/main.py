@@ -1,15 +1,57 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import router as api_router
+from fastapi.responses import JSONResponse
+from api.routes import router as api_router, load_language_codes
 from api.auth import router as auth_router
 from starlette.middleware.sessions import SessionMiddleware
 import os
+import re
 from api.auth_email import router as email_auth_router
+from api.retime import router as retime_router
+from api.search import router as search_router
+from config import settings
+from database.db import get_engine, dispose_engine
+from services.admission import AdmissionController, Overloaded, MAX_UPLOAD_BYTES
+from services.checkpoints import expire_pending_translations, PENDING_SWEEP_INTERVAL
+from utils import tracing
+
+
+# Expire pending translations nobody resumed. Every worker runs this; the
+# update is idempotent, so overlapping sweeps are harmless.
+async def sweep_pending_translations():
+    while True:
+        await asyncio.sleep(PENDING_SWEEP_INTERVAL)
+        try:
+            expired = await run_in_threadpool(expire_pending_translations)
+            if expired:
+                print(f"Expired {expired} pending translations")
+        except Exception as e:
+            print(f"Pending translation sweep failed: {e}")
+
+
+# Per-process resources are created here, after the server has forked its
+# workers, instead of at import time
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    os.makedirs(settings.STORAGE_DIR, exist_ok=True)
+    get_engine()
+    app.state.admission = AdmissionController()
+    await run_in_threadpool(load_language_codes)
+    sweeper = asyncio.create_task(sweep_pending_translations())
+    yield
+    sweeper.cancel()
+    dispose_engine()
+    tracing.flush()
+
 
 app = FastAPI(
     title="Subtitle Translator API",
     description="Translate .srt and .vtt subtitle files using Azure AI Translator.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.include_router(email_auth_router)
@@ -17,17 +59,88 @@ app.include_router(email_auth_router)
 # Enable session middleware for OAuth
 app.add_middleware(SessionMiddleware, secret_key = os.getenv("SESSION_SECRET_KEY"), same_site = "lax", https_only = False)
 
-# Allow CORS for local dev
+# Endpoints that read whole uploads into memory and call Azure
+ADMISSION_CONTROLLED_PATHS = ("/api/upload-file", "/api/upload-batch")
+# Retiming doesn't call Azure but reads and parses the whole upload the same way
+RETIME_PATH_PREFIX = "/api/retime/"
+# Resumes upload nothing but still translate, so they take a slot too
+RESUME_PATH = re.compile(r"^/api/translations/[^/]+/resume$")
+
+
+# Admission control runs before the multipart body is read, so oversized or
+# excess uploads are turned away without buffering them
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    if request.method != "POST":
+        return await call_next(request)
+
+    if RESUME_PATH.match(request.url.path):
+        size = 0
+    elif request.url.path in ADMISSION_CONTROLLED_PATHS or request.url.path.startswith(RETIME_PATH_PREFIX):
+        content_length = request.headers.get("content-length")
+        if content_length is None or not content_length.isdigit():
+            return JSONResponse(status_code=411, content={"error": "Content-Length header is required for uploads."})
+        size = int(content_length)
+        if size > MAX_UPLOAD_BYTES:
+            return JSONResponse(
+                status_code=413,
+                content={"error": f"Upload too large. Maximum size is {MAX_UPLOAD_BYTES} bytes."}
+            )
+    else:
+        return await call_next(request)
+
+    try:
+        async with request.app.state.admission.admit(size):
+            return await call_next(request)
+    except Overloaded as e:
+        return JSONResponse(
+            status_code=503,
+            content={"error": str(e)},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
+# Per-request stage tracing; optionally samples a flamegraph for the request
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    if not settings.TRACE_ENABLED:
+        return await call_next(request)
+
+    trace, token = tracing.start_trace(request.url.path)
+    trace.attrs["method"] = request.method
+
+    profiler = None
+    if tracing.should_profile(request.headers.get("X-Profile")):
+        profiler = tracing.SamplingProfiler(trace=trace).start()
+
+    try:
+        response = await call_next(request)
+        trace.attrs["status_code"] = response.status_code
+        response.headers["X-Trace-Id"] = trace.trace_id
+        return response
+    finally:
+        if profiler:
+            profile = await run_in_threadpool(tracing.finish_profile, profiler, trace)
+            if profile:
+                trace.attrs["profile"] = profile
+        tracing.end_trace(token)
+        tracing.emit(trace.to_record())
+
+# Allow CORS for local dev. Added last so it wraps every other middleware and
+# early rejections (411/413/503 from admission control) are readable by the browser.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],  # For development; restrict in production
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "X-Trace-Id"],
 )
 
 # API Routes
 app.include_router(api_router, prefix="/api")
+app.include_router(retime_router, prefix="/api")
+app.include_router(search_router, prefix="/api")
 app.include_router(auth_router)
 
 @app.get("/")
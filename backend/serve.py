@@ -0,0 +1,51 @@
+import os
+import sys
+
+import uvicorn
+
+from config import settings
+
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+
+# CPUs this container may actually use: the affinity mask, capped by a
+# cgroup v2 CPU quota when one is set (e.g. docker --cpus=2)
+def available_cpus() -> int:
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    try:
+        with open(CGROUP_CPU_MAX) as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def worker_count() -> int:
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    # Requests mostly wait on Azure and Postgres, so run a little above one worker per core
+    return available_cpus() + 1
+
+
+def main():
+    workers = worker_count()
+    # Workers read this to size their share of the database connection budget
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    print(f"Starting {workers} workers")
+
+    uvicorn.run(
+        "main:app",
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=workers,
+        proxy_headers=True,
+        timeout_graceful_shutdown=settings.GRACEFUL_TIMEOUT,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
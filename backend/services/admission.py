@@ -0,0 +1,81 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+# Per-worker limits for expensive endpoints (uploads that trigger translation)
+MAX_INFLIGHT_TRANSLATIONS = int(os.getenv("MAX_INFLIGHT_TRANSLATIONS", "8"))
+MAX_BUFFERED_UPLOAD_BYTES = int(os.getenv("MAX_BUFFERED_UPLOAD_BYTES", str(64 * 1024 * 1024)))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "10"))
+
+# Per-request limits, checked before any work is done
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+MAX_CUES_PER_FILE = int(os.getenv("MAX_CUES_PER_FILE", "20000"))
+
+
+class Overloaded(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Server is busy, please retry shortly.")
+        self.retry_after = retry_after
+
+
+# Caps concurrent translations and the upload bytes they buffer in this
+# worker. Requests that don't fit wait briefly in a bounded queue, then are
+# turned away with Overloaded so the caller can answer 503 + Retry-After.
+class AdmissionController:
+    def __init__(
+        self,
+        max_in_flight: int = MAX_INFLIGHT_TRANSLATIONS,
+        max_buffered_bytes: int = MAX_BUFFERED_UPLOAD_BYTES,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+        retry_after: int = ADMISSION_RETRY_AFTER,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_buffered_bytes = max_buffered_bytes
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.buffered_bytes = 0
+        self.waiting = 0
+        self._cond = asyncio.Condition()
+
+    def _fits(self, size: int) -> bool:
+        if self.in_flight >= self.max_in_flight:
+            return False
+        # A single request larger than the budget may still run when nothing else is
+        return self.in_flight == 0 or self.buffered_bytes + size <= self.max_buffered_bytes
+
+    @asynccontextmanager
+    async def admit(self, size: int):
+        async with self._cond:
+            if not self._fits(size):
+                if self.waiting >= self.max_queue:
+                    raise Overloaded(self.retry_after)
+                self.waiting += 1
+                try:
+                    await asyncio.wait_for(self._cond.wait_for(lambda: self._fits(size)), self.queue_timeout)
+                except asyncio.TimeoutError:
+                    raise Overloaded(self.retry_after)
+                finally:
+                    self.waiting -= 1
+            self.in_flight += 1
+            self.buffered_bytes += size
+
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self.in_flight -= 1
+                self.buffered_bytes -= size
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "buffered_bytes": self.buffered_bytes,
+            "waiting": self.waiting,
+            "max_in_flight": self.max_in_flight,
+        }
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.exc import IntegrityError
+
+from database.db import SessionLocal
+from database.models import SubtitleFile, Translation, TranslationChunk
+
+# Pending translations not resumed within this long are expired: their
+# checkpoints and uploaded source file are deleted
+PENDING_TRANSLATION_TTL = int(os.getenv("PENDING_TRANSLATION_TTL", str(24 * 3600)))
+PENDING_SWEEP_INTERVAL = int(os.getenv("PENDING_SWEEP_INTERVAL", "3600"))
+
+
+def chunk_hash(chunk) -> str:
+    payload = json.dumps(chunk, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Per-chunk results of one pending Translation. detect_and_translate asks it
+# for each chunk before calling Azure and hands it every chunk it translates.
+# A saved chunk is only reused when its source texts hash the same, so a
+# changed chunk size or source file can't splice in stale results.
+class ChunkCheckpoint:
+    def __init__(self, translation_id):
+        self.translation_id = translation_id
+        self.reused_chunks = 0
+        self.reused_chars = 0
+        db = SessionLocal()
+        try:
+            rows = db.query(TranslationChunk).filter(TranslationChunk.translation_id == translation_id).all()
+            self._saved = {row.chunk_index: (row.source_hash, json.loads(row.translated_texts)) for row in rows}
+        finally:
+            db.close()
+
+    def __len__(self):
+        return len(self._saved)
+
+    def get(self, index: int, chunk):
+        saved = self._saved.get(index)
+        if saved is None or saved[0] != chunk_hash(chunk) or len(saved[1]) != len(chunk):
+            return None
+        self.reused_chunks += 1
+        self.reused_chars += sum(len(t) for t in chunk)
+        return saved[1]
+
+    # Committed straight away in its own session: the point is to survive the
+    # request failing or the worker dying before the translation completes
+    def save(self, index: int, chunk, translated):
+        db = SessionLocal()
+        try:
+            db.query(TranslationChunk).filter(
+                TranslationChunk.translation_id == self.translation_id,
+                TranslationChunk.chunk_index == index,
+            ).delete()
+            db.add(TranslationChunk(
+                translation_id=self.translation_id,
+                chunk_index=index,
+                source_hash=chunk_hash(chunk),
+                translated_texts=json.dumps(translated, ensure_ascii=False),
+                created_at=datetime.now(timezone.utc),
+            ))
+            db.commit()
+        except IntegrityError:
+            # A concurrent resume of the same translation saved it first
+            db.rollback()
+        finally:
+            db.close()
+
+    # Drop the checkpoints in the caller's transaction once the output is recorded
+    def clear(self, db):
+        db.query(TranslationChunk).filter(TranslationChunk.translation_id == self.translation_id).delete()
+
+
+# Detach the uploaded source file from its row; the caller deletes the
+# returned path once the change is committed
+def release_upload(original: SubtitleFile):
+    path = original.storage_path
+    original.storage_path = None
+    return path
+
+
+def remove_files(paths):
+    for path in paths:
+        if path:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def expire_pending_translations(max_age_seconds: int = PENDING_TRANSLATION_TTL) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Translation, SubtitleFile)
+            .join(SubtitleFile, SubtitleFile.file_id == Translation.file_id)
+            .filter(Translation.translation_status == "pending", Translation.requested_at < cutoff)
+            .all()
+        )
+        paths = []
+        for translation, original in rows:
+            db.query(TranslationChunk).filter(TranslationChunk.translation_id == translation.translation_id).delete()
+            translation.translation_status = "expired"
+            paths.append(release_upload(original))
+        db.commit()
+    finally:
+        db.close()
+
+    remove_files(paths)
+    return len(rows)
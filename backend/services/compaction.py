@@ -0,0 +1,85 @@
+import re
+
+_TAG = r"(?:\{\\[^}]*\}|<(?:[ibus]|font)(?:\s[^>]*)?>)"
+
+# Markup that can open a subtitle line: ASS/SSA override blocks ({\an8}),
+# HTML-style tags and a dialogue dash, then optionally an upper-case speaker
+# label ("JOHN:", "DR. WHO:"). None of it needs translating.
+_OPEN_MARKUP = re.compile(rf"(?:\s*{_TAG})*(?:\s*-(?!\d))?(?:\s*{_TAG})*\s*", re.IGNORECASE)
+_SPEAKER = re.compile(r"[A-Z][A-Z0-9 .'\-]{0,30}:\s+")
+_LABEL_WORDS = re.compile(r"[A-Z0-9']+")
+# Upper-case words that open ordinary sentences rather than name a speaker
+# ("OK: let's go", "NOTE: Bring food", "I SAID: GO AWAY")
+_NOT_NAMES = frozenset("""
+    A AN AND ANSWER AS AT ATTENTION BUT BY CAUTION DANGER DO FOR FROM HE HEY I IF IN IS IT LISTEN LOOK ME MY
+    NB NO NOTE NOW OF OH OK OKAY ON OR P PS Q QUESTION REMEMBER RULE SAID SAY SAYS SHE SO STEP THE THEN THEY
+    TIP TO TOLD UPDATE WAIT WARNING WE WELL WHAT WHY YEAH YES YOU
+""".split())
+_CLOSE_MARKUP = re.compile(r"(?:\s*(?:</(?:[ibus]|font)>|\{\\[^}]*\}))*\s*$", re.IGNORECASE)
+_INNER_MARKUP = re.compile(rf"{_TAG}|</(?:[ibus]|font)>", re.IGNORECASE)
+_SPACES = re.compile(r"[ \t]+")
+
+
+# A label is only stripped when it looks like a name and the line goes on in
+# mixed case. In all-caps (SDH) subtitles a label can't be told from the
+# start of a sentence, so the whole line is translated.
+def _speaker(line: str, start: int):
+    speaker = _SPEAKER.match(line, start)
+    if not speaker:
+        return None
+    if any(word in _NOT_NAMES for word in _LABEL_WORDS.findall(speaker.group(0))):
+        return None
+    rest = _INNER_MARKUP.sub("", line[speaker.end():])
+    if rest == rest.upper():
+        return None
+    return speaker
+
+
+def _split_line(line: str):
+    line = _SPACES.sub(" ", line)
+    end = _OPEN_MARKUP.match(line).end()
+    speaker = _speaker(line, end)
+    if speaker:
+        end = _OPEN_MARKUP.match(line, speaker.end()).end()
+    rest = line[end:]
+    suffix = _CLOSE_MARKUP.search(rest).group(0)
+    body = rest[:len(rest) - len(suffix)]
+    if _INNER_MARKUP.search(body):
+        # Tags inside the sentence have to travel with the text they wrap
+        return "", line, ""
+    return line[:end], body, suffix
+
+
+# Strips markup from the edges of each cue line so only translatable text is
+# sent (and billed). Returns the compact texts, the markup needed to restore
+# them, and how many characters were removed.
+def compact(texts):
+    compacted = []
+    markup = []
+    saved = 0
+    for text in texts:
+        lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        parts = [_split_line(line) for line in lines]
+        body = "\n".join(p[1] for p in parts)
+        compacted.append(body)
+        markup.append([(p[0], p[2]) for p in parts])
+        saved += len(text) - len(body)
+    return compacted, markup, saved
+
+
+def restore(translated, markup):
+    restored = []
+    for text, lines in zip(translated, markup):
+        if not any(prefix or suffix for prefix, suffix in lines):
+            restored.append(text)
+            continue
+
+        translated_lines = text.split("\n")
+        if len(translated_lines) == len(lines):
+            restored.append("\n".join(
+                prefix + line + suffix for line, (prefix, suffix) in zip(translated_lines, lines)
+            ))
+        else:
+            # The translator reflowed the lines; keep the outer markup only
+            restored.append(lines[0][0] + text + lines[-1][1])
+    return restored
@@ -0,0 +1,152 @@
+import re
+
+import numpy as np
+
+# One cue timing line, SRT ("00:00:01,000") or WebVTT ("00:01.000", optional hours)
+_TIMING = re.compile(
+    r"^[ \t]*(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{3})[ \t]*-->[ \t]*(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{3})([^\n]*)$",
+    re.MULTILINE,
+)
+_SCALE = np.array([3600000, 60000, 1000, 1], dtype=np.int64)
+
+
+# Format-neutral, columnar store for a subtitle file: start/end times are
+# int64 millisecond arrays and every cue's text lives in one string indexed
+# by an offsets array. Retiming works on whole columns at once, so it costs
+# a few numpy passes instead of touching one Python object per cue.
+class CueTable:
+    def __init__(self, starts, ends, text: str, offsets, header: str = "", settings=None):
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        self.text = text
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.header = header
+        # WebVTT cue settings ("align:start line:0"), kept only for cues that have them
+        self.settings = settings or {}
+
+    def __len__(self):
+        return len(self.starts)
+
+    @classmethod
+    def from_texts(cls, starts, ends, texts, header: str = ""):
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum([len(t) for t in texts], out=offsets[1:])
+        return cls(starts, ends, "".join(texts), offsets, header)
+
+    @classmethod
+    def parse(cls, content: str):
+        content = content.lstrip("﻿").replace("\r\n", "\n").replace("\r", "\n")
+        matches = list(_TIMING.finditer(content))
+        header = ""
+        if matches and content.startswith("WEBVTT"):
+            header = content[:content.rfind("\n\n", 0, matches[0].start()) + 1].rstrip("\n")
+
+        groups = np.array([m.groups("0")[:8] for m in matches], dtype=np.int64).reshape(-1, 8)
+        starts = groups[:, 0:4] @ _SCALE
+        ends = groups[:, 4:8] @ _SCALE
+
+        texts = []
+        settings = {}
+        for i, m in enumerate(matches):
+            end = content.find("\n\n", m.end())
+            if i + 1 < len(matches):
+                # Never run into the next cue, even when the blank line is missing
+                next_block = content.rfind("\n", m.end(), matches[i + 1].start())
+                end = next_block if end == -1 or end > next_block else end
+            texts.append(content[m.end() + 1:end if end != -1 else len(content)].strip("\n"))
+            if m.group(9).strip():
+                settings[i] = m.group(9).strip()
+
+        table = cls.from_texts(starts, ends, texts, header)
+        table.settings = settings
+        return table
+
+    def cue_text(self, i: int) -> str:
+        return self.text[self.offsets[i]:self.offsets[i + 1]]
+
+    def texts(self):
+        return [self.cue_text(i) for i in range(len(self))]
+
+    # --- Vectorized timing operations (in place; return self for chaining) ---
+
+    def shift(self, offset_ms: int):
+        self.starts += offset_ms
+        self.ends += offset_ms
+        np.maximum(self.starts, 0, out=self.starts)
+        np.maximum(self.ends, 0, out=self.ends)
+        return self
+
+    # Re-time for a different frame rate, e.g. 23.976 -> 25 for PAL speed-up
+    def convert_fps(self, from_fps: float, to_fps: float):
+        return self._scale(from_fps / to_fps, 0.0)
+
+    # Linear two-point sync: the cue at source time a_src should appear at
+    # a_dst and b_src at b_dst; everything else is interpolated/extrapolated
+    def resync(self, a_src: int, a_dst: int, b_src: int, b_dst: int):
+        if a_src == b_src:
+            raise ValueError("Sync points must have different source times.")
+        factor = (b_dst - a_dst) / (b_src - a_src)
+        return self._scale(factor, a_dst - a_src * factor)
+
+    # Sort cues by start time, then trim overlaps to leave min_gap_ms between
+    # neighbours and stretch short cues towards min_duration_ms where there is room
+    def repair(self, min_gap_ms: int = 0, min_duration_ms: int = 0):
+        order = np.argsort(self.starts, kind="stable")
+        if np.any(order != np.arange(len(order))):
+            self._reorder(order)
+
+        if len(self) == 0:
+            return self
+        limit = np.empty_like(self.ends)
+        limit[:-1] = self.starts[1:] - min_gap_ms
+        limit[-1] = np.iinfo(np.int64).max
+        np.minimum(self.ends, limit, out=self.ends)
+        np.maximum(self.ends, np.minimum(self.starts + min_duration_ms, limit), out=self.ends)
+        np.maximum(self.ends, self.starts, out=self.ends)
+        return self
+
+    def _scale(self, factor: float, offset: float):
+        self.starts = np.rint(self.starts * factor + offset).astype(np.int64)
+        self.ends = np.rint(self.ends * factor + offset).astype(np.int64)
+        np.maximum(self.starts, 0, out=self.starts)
+        np.maximum(self.ends, 0, out=self.ends)
+        return self
+
+    def _reorder(self, order):
+        texts = self.texts()
+        settings = {new: self.settings[old] for new, old in enumerate(order) if old in self.settings}
+        reordered = CueTable.from_texts(self.starts[order], self.ends[order], [texts[i] for i in order], self.header)
+        self.starts, self.ends, self.text, self.offsets = reordered.starts, reordered.ends, reordered.text, reordered.offsets
+        self.settings = settings
+
+    # --- Output ---
+
+    def _timestamps(self, values, separator: str):
+        hours, rest = np.divmod(values, 3600000)
+        minutes, rest = np.divmod(rest, 60000)
+        seconds, millis = np.divmod(rest, 1000)
+        return [
+            f"{h:02d}:{m:02d}:{s:02d}{separator}{ms:03d}"
+            for h, m, s, ms in zip(hours.tolist(), minutes.tolist(), seconds.tolist(), millis.tolist())
+        ]
+
+    def to_srt(self) -> str:
+        starts = self._timestamps(self.starts, ",")
+        ends = self._timestamps(self.ends, ",")
+        blocks = [
+            f"{i + 1}\n{start} --> {end}\n{self.cue_text(i)}\n"
+            for i, (start, end) in enumerate(zip(starts, ends))
+        ]
+        return "\n".join(blocks)
+
+    def to_vtt(self) -> str:
+        starts = self._timestamps(self.starts, ".")
+        ends = self._timestamps(self.ends, ".")
+        blocks = [self.header or "WEBVTT"]
+        for i, (start, end) in enumerate(zip(starts, ends)):
+            settings = f" {self.settings[i]}" if i in self.settings else ""
+            blocks.append(f"{start} --> {end}{settings}\n{self.cue_text(i)}")
+        return "\n\n".join(blocks) + "\n"
+
+    def compose(self, file_ext: str) -> str:
+        return self.to_srt() if file_ext.lower() == ".srt" else self.to_vtt()
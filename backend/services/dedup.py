@@ -0,0 +1,30 @@
+import re
+
+# Cues with no letters at all (timestamps, numbers, punctuation, "♪", "...")
+# come back from the translator unchanged, so they are never sent.
+_NO_LETTERS = re.compile(r"[\W\d_]*")
+
+
+def is_untranslatable(text: str) -> bool:
+    return _NO_LETTERS.fullmatch(text) is not None
+
+
+# Collapses a request to the unique translatable strings. positions[i] is the
+# index of texts[i] in the unique list, or None when it is passed through.
+def plan(texts):
+    unique = []
+    index = {}
+    positions = []
+    for text in texts:
+        if is_untranslatable(text):
+            positions.append(None)
+            continue
+        if text not in index:
+            index[text] = len(unique)
+            unique.append(text)
+        positions.append(index[text])
+    return unique, positions
+
+
+def scatter(translated_unique, texts, positions):
+    return [text if pos is None else translated_unique[pos] for text, pos in zip(texts, positions)]
@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from services.cues import CueTable
+
+SUBTITLE_EXTENSIONS = (".srt", ".vtt")
+
+_MARKUP = re.compile(r"<[^>]*>|\{\\[^}]*\}")
+_PUNCTUATION = re.compile(r"[^\w\s']+")
+
+# A hypothesis cue is matched to the reference cue showing at its midpoint.
+# When no reference cue is showing, the nearest one within this much drift
+# either side is used instead.
+ALIGN_TOLERANCE_MS = 500
+
+
+# Cue texts repeat heavily ("Yeah.", "[music]"), so normalisation and
+# tokenisation are cached per worker process
+@lru_cache(maxsize=65536)
+def normalize(text: str) -> str:
+    text = _MARKUP.sub(" ", text).lower()
+    return " ".join(_PUNCTUATION.sub(" ", text).split())
+
+
+@lru_cache(maxsize=65536)
+def words(text: str):
+    return tuple(normalize(text).split())
+
+
+@lru_cache(maxsize=65536)
+def chars(text: str):
+    return tuple(normalize(text))
+
+
+def edit_distance(ref, hyp) -> int:
+    if not ref:
+        return len(hyp)
+    if not hyp:
+        return len(ref)
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1]
+
+
+# Pair every reference cue with the hypothesis text shown during it. Unmatched
+# reference cues pair with "" (deletions); hypothesis cues that fall outside
+# every reference cue pair with a "" reference (insertions).
+def align(ref: CueTable, hyp: CueTable):
+    ref_texts = ref.texts()
+    hyp_texts = hyp.texts()
+    if not len(ref):
+        return [("", text) for text in hyp_texts]
+
+    order = np.argsort(ref.starts, kind="stable")
+    starts = ref.starts[order]
+    ends = ref.ends[order]
+
+    mids = (hyp.starts + hyp.ends) // 2
+    # Last reference cue starting at or before the midpoint, and the one after it
+    before = np.searchsorted(starts, mids, side="right") - 1
+    after = before + 1
+    gap_before = np.where(before >= 0, mids - ends[np.maximum(before, 0)], np.inf)
+    gap_after = np.where(after < len(starts), starts[np.minimum(after, len(starts) - 1)] - mids, np.inf)
+
+    # The next cue starts after the midpoint, so a cue containing it
+    # (gap_before <= 0) always wins; otherwise the closer neighbour does
+    use_before = gap_before <= gap_after
+    slot = np.where(use_before, before, after)
+    matched = np.where(use_before, gap_before, gap_after) <= ALIGN_TOLERANCE_MS
+
+    assigned = defaultdict(list)
+    pairs = []
+    for j, (ok, s) in enumerate(zip(matched.tolist(), slot.tolist())):
+        if ok:
+            assigned[order[s]].append(hyp_texts[j])
+        else:
+            pairs.append(("", hyp_texts[j]))
+
+    for i, text in enumerate(ref_texts):
+        pairs.append((text, " ".join(assigned.get(i, []))))
+    return pairs
+
+
+def read_cues(path: str) -> CueTable:
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return CueTable.parse(f.read())
+
+
+# Score one reference/hypothesis file pair (runs in a worker process)
+def evaluate_pair(ref_path: str, hyp_path: str, per_cue: bool = False):
+    totals = {"cues": 0, "word_errors": 0, "ref_words": 0, "char_errors": 0, "ref_chars": 0}
+    cues = []
+    for ref_text, hyp_text in align(read_cues(ref_path), read_cues(hyp_path)):
+        ref_words, hyp_words = words(ref_text), words(hyp_text)
+        ref_chars, hyp_chars = chars(ref_text), chars(hyp_text)
+        word_errors = edit_distance(ref_words, hyp_words)
+        char_errors = edit_distance(ref_chars, hyp_chars)
+
+        totals["cues"] += 1
+        totals["word_errors"] += word_errors
+        totals["ref_words"] += len(ref_words)
+        totals["char_errors"] += char_errors
+        totals["ref_chars"] += len(ref_chars)
+        if per_cue:
+            cues.append({
+                "reference": ref_text,
+                "hypothesis": hyp_text,
+                "wer": word_errors / len(ref_words) if ref_words else float(bool(hyp_words)),
+                "cer": char_errors / len(ref_chars) if ref_chars else float(bool(hyp_chars)),
+            })
+    return totals, cues
+
+
+def _rates(totals: dict) -> dict:
+    return {
+        **totals,
+        "wer": totals["word_errors"] / totals["ref_words"] if totals["ref_words"] else 0.0,
+        "cer": totals["char_errors"] / totals["ref_chars"] if totals["ref_chars"] else 0.0,
+    }
+
+
+# Hypotheses are laid out as <hyp_dir>/<engine>/<language>/<path of the
+# reference file>, with either subtitle extension. Returns (engine, language,
+# relative path, reference path, hypothesis path) for every pair found.
+def find_pairs(ref_dir: str, hyp_dir: str):
+    references = {}
+    for root, _, filenames in os.walk(ref_dir):
+        for filename in filenames:
+            stem, ext = os.path.splitext(filename)
+            if ext.lower() in SUBTITLE_EXTENSIONS:
+                rel_stem = os.path.relpath(os.path.join(root, stem), ref_dir)
+                references[rel_stem] = os.path.join(root, filename)
+
+    pairs = []
+    for engine in sorted(os.listdir(hyp_dir)):
+        engine_dir = os.path.join(hyp_dir, engine)
+        if not os.path.isdir(engine_dir):
+            continue
+        for language in sorted(os.listdir(engine_dir)):
+            language_dir = os.path.join(engine_dir, language)
+            if not os.path.isdir(language_dir):
+                continue
+            for root, _, filenames in os.walk(language_dir):
+                for filename in sorted(filenames):
+                    stem, ext = os.path.splitext(filename)
+                    rel_stem = os.path.relpath(os.path.join(root, stem), language_dir)
+                    if ext.lower() in SUBTITLE_EXTENSIONS and rel_stem in references:
+                        pairs.append((engine, language, rel_stem, references[rel_stem], os.path.join(root, filename)))
+    return pairs
+
+
+def run_evaluation(ref_dir: str, hyp_dir: str, workers: int = None, per_cue: bool = False):
+    pairs = find_pairs(ref_dir, hyp_dir)
+    groups = defaultdict(lambda: {"files": 0, "cues": 0, "word_errors": 0, "ref_words": 0, "char_errors": 0, "ref_chars": 0})
+    files = []
+
+    with ProcessPoolExecutor(workers) as pool:
+        results = pool.map(
+            evaluate_pair,
+            [p[3] for p in pairs], [p[4] for p in pairs], [per_cue] * len(pairs),
+            chunksize=max(1, len(pairs) // ((workers or os.cpu_count() or 1) * 4)),
+        )
+        for (engine, language, rel_stem, _, hyp_path), (totals, cues) in zip(pairs, results):
+            group = groups[(engine, language)]
+            group["files"] += 1
+            for key, value in totals.items():
+                group[key] += value
+            entry = {"engine": engine, "language": language, "file": rel_stem, **_rates(totals)}
+            if per_cue:
+                entry["cue_scores"] = cues
+            files.append(entry)
+
+    report = defaultdict(dict)
+    for (engine, language), totals in sorted(groups.items()):
+        report[engine][language] = _rates(totals)
+    return {"engines": dict(report), "files": files}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score translated subtitles against references (WER/CER)")
+    parser.add_argument("references", help="Directory of reference subtitles")
+    parser.add_argument("hypotheses", help="Directory laid out as <engine>/<language>/<reference path>")
+    parser.add_argument("--out", help="Write the full JSON report here")
+    parser.add_argument("--workers", type=int, help="Worker processes (defaults to the CPU count)")
+    parser.add_argument("--per-cue", action="store_true", help="Include per-cue scores in the report")
+    args = parser.parse_args(argv)
+
+    report = run_evaluation(args.references, args.hypotheses, args.workers, args.per_cue)
+    for engine, languages in report["engines"].items():
+        for language, r in languages.items():
+            print(f"{engine:<20} {language:<8} files={r['files']:<6} cues={r['cues']:<8} WER={r['wer']:.3f} CER={r['cer']:.3f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+import heapq
+import itertools
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: slots are limited within the process only
+    fcntl = None
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+# Concurrent Azure requests allowed across every worker on the host, and how
+# many of those bulk work may never occupy so a small interactive job can
+# always start promptly.
+AZURE_MAX_CONCURRENCY = int(os.getenv("AZURE_MAX_CONCURRENCY", "4"))
+INTERACTIVE_RESERVED_SLOTS = int(os.getenv("INTERACTIVE_RESERVED_SLOTS", "1"))
+SCHEDULER_DIR = os.getenv("SCHEDULER_DIR", os.path.join(tempfile.gettempdir(), "subtitle-scheduler"))
+
+# Jobs up to this many characters (a single Azure chunk by default) go to the interactive lane
+INTERACTIVE_MAX_CHARS = int(os.getenv("INTERACTIVE_MAX_CHARS", "20000"))
+
+ROLE_WEIGHTS = {"admin": 4.0, "premium": 2.0, "user": 1.0}
+
+
+def user_weight(user) -> float:
+    if user is None:
+        return 1.0
+    weight = ROLE_WEIGHTS.get(user.role or "user", 1.0)
+    # Accounts that have run out of credits still get served, at half share
+    if user.credits is not None and user.credits <= 0:
+        weight /= 2
+    return weight
+
+
+def classify_lane(texts) -> str:
+    return INTERACTIVE if sum(len(t) for t in texts) <= INTERACTIVE_MAX_CHARS else BULK
+
+
+class _Ticket:
+    __slots__ = ("granted",)
+
+    def __init__(self):
+        self.granted = False
+
+
+class _Lane:
+    def __init__(self):
+        self.queue = []          # heap of (finish_tag, seq, ticket)
+        self.virtual_time = 0.0
+        self.last_finish = {}    # user_key -> finish tag of their latest queued request
+
+
+# Azure request slots shared by the worker processes of one host: one flock'd
+# file per slot, the first `reserved` of them for interactive work only. A
+# worker that dies releases its slots with its file descriptors.
+class _HostSlots:
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, lock_dir: str, capacity: int, reserved: int):
+        self.lock_dir = lock_dir
+        self.capacity = capacity
+        self.reserved = reserved
+        self._lock = threading.Lock()
+        self._files = None
+        self._pid = None
+        self._held = []
+
+    def _slot_files(self):
+        # Opened lazily per process: descriptors inherited across a fork share
+        # their locks with the parent
+        if self._pid != os.getpid():
+            os.makedirs(self.lock_dir, exist_ok=True)
+            self._files = [open(os.path.join(self.lock_dir, f"slot-{i}.lock"), "a+") for i in range(self.capacity)]
+            self._pid = os.getpid()
+            self._held = []
+        return self._files
+
+    def acquire(self, lane: str):
+        first = 0 if lane == INTERACTIVE else self.reserved
+        while True:
+            with self._lock:
+                files = self._slot_files()
+                for i in range(first, self.capacity):
+                    if i in self._held:
+                        continue
+                    try:
+                        fcntl.flock(files[i], fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue
+                    self._held.append(i)
+                    return
+            time.sleep(self.POLL_INTERVAL)
+
+    # Any held slot will do: only the number of locked slots of each kind matters
+    def release(self):
+        with self._lock:
+            fcntl.flock(self._files[self._held.pop()], fcntl.LOCK_UN)
+
+
+# Weighted fair queuing over Azure request slots. Each user's requests get
+# virtual finish tags advancing by cost / weight, so a user with a long queue
+# of chunks is interleaved with everyone else instead of draining first.
+# The interactive lane is always served first; bulk only fills slots beyond
+# the interactive reservation.
+#
+# With a lock_dir, a granted request must also take one of the host-wide
+# slots in it, so the capacity and interactive reservation hold across all
+# workers. Fair-share ordering still applies within each worker only: workers
+# compete for host slots first come, first served.
+class FairScheduler:
+    def __init__(self, capacity: int = AZURE_MAX_CONCURRENCY, interactive_reserved: int = INTERACTIVE_RESERVED_SLOTS,
+                 lock_dir: str = None):
+        self.capacity = max(1, capacity)
+        self.interactive_reserved = min(max(0, interactive_reserved), self.capacity - 1)
+        self._cond = threading.Condition()
+        self._lanes = {INTERACTIVE: _Lane(), BULK: _Lane()}
+        self._in_flight = 0
+        self._seq = itertools.count()
+        self._host = _HostSlots(lock_dir, self.capacity, self.interactive_reserved) if lock_dir and fcntl else None
+
+    # Blocks until the request is granted a slot; pair with release()
+    def acquire(self, user_key, cost: float, weight: float = 1.0, lane: str = BULK):
+        ticket = _Ticket()
+        with self._cond:
+            q = self._lanes[lane]
+            start = max(q.virtual_time, q.last_finish.get(user_key, 0.0))
+            finish = start + max(cost, 1.0) / max(weight, 0.01)
+            q.last_finish[user_key] = finish
+            heapq.heappush(q.queue, (finish, next(self._seq), ticket))
+            self._dispatch()
+            while not ticket.granted:
+                self._cond.wait()
+
+        if self._host:
+            try:
+                self._host.acquire(lane)
+            except BaseException:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._dispatch()
+                raise
+
+    def release(self):
+        if self._host:
+            self._host.release()
+        with self._cond:
+            self._in_flight -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, user_key, cost: float, weight: float = 1.0, lane: str = BULK):
+        self.acquire(user_key, cost, weight, lane)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "queued_interactive": len(self._lanes[INTERACTIVE].queue),
+                "queued_bulk": len(self._lanes[BULK].queue),
+                "shared_across_workers": self._host is not None,
+            }
+
+    # Must be called with the condition held
+    def _dispatch(self):
+        granted = False
+        while self._in_flight < self.capacity:
+            q = self._lanes[INTERACTIVE]
+            if not q.queue:
+                q = self._lanes[BULK]
+                if not q.queue or self._in_flight >= self.capacity - self.interactive_reserved:
+                    break
+            finish, _, ticket = heapq.heappop(q.queue)
+            q.virtual_time = max(q.virtual_time, finish)
+            if not q.queue:
+                # Idle lane: forget old tags so returning users start level
+                q.last_finish.clear()
+            ticket.granted = True
+            self._in_flight += 1
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+
+scheduler = FairScheduler(lock_dir=SCHEDULER_DIR)
@@ -0,0 +1,110 @@
+import os
+
+from sqlalchemy import desc, func, insert, or_, select
+
+from database.models import SubtitleCue, SubtitleFile
+from services.cues import CueTable
+
+SEARCH_CONFIG = "simple"
+MAX_PAGE_SIZE = int(os.getenv("SEARCH_MAX_PAGE_SIZE", "100"))
+# Rows per INSERT when indexing a file, so huge files don't build one giant statement
+INDEX_BATCH_ROWS = int(os.getenv("SEARCH_INDEX_BATCH_ROWS", "5000"))
+
+# The trigram index only serves patterns with at least one full trigram;
+# anything shorter would scan every cue, so it's matched by word search alone
+_MIN_SUBSTRING_CHARS = 3
+
+
+def format_timestamp(ms: int) -> str:
+    hours, rest = divmod(int(ms), 3600000)
+    minutes, rest = divmod(rest, 60000)
+    seconds, millis = divmod(rest, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{millis:03d}"
+
+
+# Index rows for a translated file, built from the texts and timings the
+# caller already holds rather than by reading the file back from storage
+def cue_rows(subtitle_file: SubtitleFile, language: str, starts, ends, texts):
+    return [
+        {
+            "file_id": subtitle_file.file_id,
+            "user_id": subtitle_file.user_id,
+            "cue_index": i,
+            "start_ms": int(start),
+            "end_ms": int(end),
+            "language": language,
+            "content": text,
+        }
+        for i, (start, end, text) in enumerate(zip(starts, ends, texts))
+    ]
+
+
+# For callers that only have the written file (the CLI recording an earlier run)
+def file_cue_rows(subtitle_file: SubtitleFile, language: str):
+    with open(subtitle_file.storage_path, "r", encoding="utf-8-sig") as f:
+        table = CueTable.parse(f.read())
+    return cue_rows(subtitle_file, language, table.starts.tolist(), table.ends.tolist(), table.texts())
+
+
+# Add the cues of a translated file to the search index. Runs in the caller's
+# transaction, so the cues are committed together with the file's metadata.
+# Blocking; async callers run it in the threadpool.
+def index_cues(db, rows) -> int:
+    db.flush()  # the file row has to exist before its cues reference it
+    for start in range(0, len(rows), INDEX_BATCH_ROWS):
+        db.execute(insert(SubtitleCue), rows[start:start + INDEX_BATCH_ROWS])
+    return len(rows)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# Word matches (any language, websearch syntax: "quoted phrase", -excluded)
+# ranked first, plus substring matches through the trigram index. Returns one
+# extra row so the caller can tell whether another page exists.
+def search_statement(user_id, query: str, limit: int, offset: int, language: str = None, file_id=None):
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+    matches = SubtitleCue.search_vector.op("@@")(tsquery)
+    if len(query.strip()) >= _MIN_SUBSTRING_CHARS:
+        matches = or_(matches, SubtitleCue.content.ilike(f"%{_escape_like(query.strip())}%", escape="\\"))
+
+    rank = func.ts_rank(SubtitleCue.search_vector, tsquery).label("rank")
+    statement = (
+        select(
+            SubtitleCue.file_id, SubtitleFile.original_file_name, SubtitleCue.cue_index,
+            SubtitleCue.start_ms, SubtitleCue.end_ms, SubtitleCue.language, SubtitleCue.content, rank,
+        )
+        .join(SubtitleFile, SubtitleFile.file_id == SubtitleCue.file_id)
+        .where(SubtitleCue.user_id == user_id, matches)
+    )
+    if language:
+        statement = statement.where(SubtitleCue.language == language)
+    if file_id:
+        statement = statement.where(SubtitleCue.file_id == file_id)
+    return (
+        statement
+        .order_by(desc(rank), SubtitleCue.file_id, SubtitleCue.cue_index)
+        .limit(limit + 1)
+        .offset(offset)
+    )
+
+
+def search_cues(db, user_id, query: str, page: int = 1, page_size: int = 20, language: str = None, file_id=None):
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    offset = (max(page, 1) - 1) * page_size
+    rows = db.execute(search_statement(user_id, query, page_size, offset, language, file_id)).all()
+    results = [
+        {
+            "file_id": str(row.file_id),
+            "filename": row.original_file_name,
+            "cue_index": row.cue_index,
+            "start_ms": row.start_ms,
+            "end_ms": row.end_ms,
+            "timestamp": f"{format_timestamp(row.start_ms)} --> {format_timestamp(row.end_ms)}",
+            "language": row.language,
+            "text": row.content,
+        }
+        for row in rows[:page_size]
+    ]
+    return results, len(rows) > page_size
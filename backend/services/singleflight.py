@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalesce within the process only
+    fcntl = None
+
+SINGLEFLIGHT_DIR = os.getenv("SINGLEFLIGHT_DIR", os.path.join(tempfile.gettempdir(), "subtitle-singleflight"))
+
+# How long a finished result stays readable for callers in other workers that
+# were blocked behind the leader (or arrive just after it finished)
+SINGLEFLIGHT_RESULT_TTL = float(os.getenv("SINGLEFLIGHT_RESULT_TTL", "60"))
+
+
+def translation_key(texts, to_lang, no_prof) -> str:
+    payload = json.dumps([texts, to_lang, bool(no_prof)], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# Runs at most one call per key at a time. Threads in this process that ask
+# for a key already in flight wait for the leader's result; other worker
+# processes serialise on an flock'd file in SINGLEFLIGHT_DIR and read the
+# result the leader left in it.
+class SingleFlight:
+    def __init__(self, lock_dir: str = SINGLEFLIGHT_DIR, result_ttl: float = SINGLEFLIGHT_RESULT_TTL):
+        self.lock_dir = lock_dir
+        self.result_ttl = result_ttl
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._last_prune = 0.0
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_shared(key, fn)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def _do_shared(self, key, fn):
+        if fcntl is None:
+            return fn()
+
+        os.makedirs(self.lock_dir, exist_ok=True)
+        path = os.path.join(self.lock_dir, key + ".json")
+        while True:
+            f = open(path, "a+", encoding="utf-8")
+            fcntl.flock(f, fcntl.LOCK_EX)
+            # _prune may have unlinked the file while we waited for its lock;
+            # a lock on a deleted inode excludes nobody, so start again
+            try:
+                if os.stat(path).st_ino == os.fstat(f.fileno()).st_ino:
+                    break
+            except FileNotFoundError:
+                pass
+            f.close()
+
+        with f:
+            try:
+                if time.time() - os.fstat(f.fileno()).st_mtime < self.result_ttl:
+                    f.seek(0)
+                    content = f.read()
+                    if content:
+                        return json.loads(content)
+
+                # Drop the expired result and mark the file as in use, so it
+                # is neither served nor pruned while fn() runs
+                f.seek(0)
+                f.truncate()
+                os.utime(f.fileno())
+                result = fn()
+                f.seek(0)
+                f.truncate()
+                json.dump(result, f, ensure_ascii=False)
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+        self._prune()
+        return result
+
+    # Drop result files long past their TTL so the directory doesn't grow without bound
+    def _prune(self):
+        now = time.time()
+        if now - self._last_prune < self.result_ttl:
+            return
+        self._last_prune = now
+        for name in os.listdir(self.lock_dir):
+            path = os.path.join(self.lock_dir, name)
+            try:
+                if now - os.path.getmtime(path) <= self.result_ttl * 2:
+                    continue
+                with open(path, "a+", encoding="utf-8") as f:
+                    # Locked means a call for this key is running or waiting; leave it
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    if now - os.fstat(f.fileno()).st_mtime > self.result_ttl * 2:
+                        os.remove(path)
+            except OSError:
+                pass
+
+
+singleflight = SingleFlight()
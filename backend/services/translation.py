@@ -0,0 +1,381 @@
+import os
+import asyncio
+import time
+import httpx
+import srt
+import webvtt
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from dotenv import load_dotenv
+
+from database.models import SubtitleFile, Translation
+from services import compaction, dedup
+from services.scheduler import scheduler, classify_lane
+from services.singleflight import singleflight, translation_key
+from utils.tracing import span
+
+load_dotenv()
+
+AZURE_TRANSLATOR_ENDPOINT = os.getenv("AZURE_TRANSLATOR_ENDPOINT")
+AZURE_SUBSCRIPTION_KEY = os.getenv("AZURE_SUBSCRIPTION_KEY")
+AZURE_REGION = os.getenv("AZURE_REGION")
+
+if not AZURE_SUBSCRIPTION_KEY or not AZURE_REGION:
+    raise EnvironmentError("Missing AZURE_SUBSCRIPTION_KEY or AZURE_REGION in environment.")
+
+MAX_CHAR_LIMIT = 20000  # Azure limit is 50000 characters per request
+
+
+def translator_url(to_lang, no_prof):
+    path = "/translate?api-version=3.0"
+    params = f"&to={to_lang}"
+    if no_prof:
+        params += "&profanityAction=Marked"
+    return AZURE_TRANSLATOR_ENDPOINT.rstrip('/') + path + params
+
+
+def translator_headers():
+    return {
+        "Ocp-Apim-Subscription-Key": AZURE_SUBSCRIPTION_KEY,
+        "Ocp-Apim-Subscription-Region": AZURE_REGION,
+        "Content-Type": "application/json; charset=UTF-8",
+    }
+
+
+def post_with_retries(url, headers, json_body, retries=14):
+    for i in range(retries):
+        with span("azure.request", attempt=i + 1) as attrs:
+            response = httpx.post(url, headers=headers, json=json_body)
+            attrs["status_code"] = response.status_code
+        if response.status_code == 429:
+            wait = 5
+            print(f"Rate limited. Retrying in {wait} seconds...")
+            time.sleep(wait)
+            continue
+        response.raise_for_status()
+        return response
+    raise Exception("Exceeded retry limit for translation request.")
+
+
+def chunk_texts(texts, max_chars):
+    chunks = []
+    current_chunk = []
+    current_length = 0
+
+    for text in texts:
+        length = len(text)
+        if current_length + length > max_chars:
+            chunks.append(current_chunk)
+            current_chunk = [text]
+            current_length = length
+        else:
+            current_chunk.append(text)
+            current_length += length
+
+    if current_chunk:
+        chunks.append(current_chunk)
+
+    return chunks
+
+
+# Each chunk waits for a fair-share slot on the scheduler before it goes to Azure.
+# With a checkpoint, chunks it already holds are skipped and every newly
+# translated chunk is saved to it before moving on.
+def detect_and_translate(texts, to_lang, no_prof, user_key=None, weight=1.0, lane=None, checkpoint=None):
+    url = translator_url(to_lang, no_prof)
+    headers = translator_headers()
+
+    translated = []
+    count = 1
+    with span("chunk", cues=len(texts)) as attrs:
+        total_chunks = chunk_texts(texts, MAX_CHAR_LIMIT)
+        attrs["chunks"] = len(total_chunks)
+    if lane is None:
+        lane = classify_lane(texts)
+    for index, chunk in enumerate(total_chunks):
+        saved = checkpoint.get(index, chunk) if checkpoint is not None else None
+        if saved is not None:
+            print("Reusing Chunk", count, "of", len(total_chunks))
+            translated.extend(saved)
+            count += 1
+            continue
+
+        body = [{"Text": t} for t in chunk]
+        try:
+            # print("\nSource Chunk", count, ":", body)
+            print("Translating Chunk", count, "of", len(total_chunks))
+            chars = sum(len(t) for t in chunk)
+            with span("schedule.wait", lane=lane):
+                scheduler.acquire(user_key, chars, weight, lane)
+            try:
+                with span("translate.chunk", chunk=count, cues=len(chunk), chars=chars):
+                    response = post_with_retries(url, headers, body)
+                    data = response.json()
+            finally:
+                scheduler.release()
+            results = [item["translations"][0]["text"] for item in data]
+            if checkpoint is not None:
+                with span("checkpoint.save", chunk=count):
+                    checkpoint.save(index, chunk, results)
+            translated.extend(results)
+            count += 1
+        except httpx.HTTPStatusError as e:
+            print("Status Code:", e.response.status_code)
+            print("Response Text:", e.response.text)
+            raise e
+        except Exception as ex:
+            print("Translation Error:", ex)
+            raise ex
+
+    # print("\nTranslated Output:", translated)
+    return translated
+
+
+# Compacted, deduplicated form of a cue list: markup is stripped from the
+# edges of each line and only unique translatable strings are kept. expand()
+# maps translations of `unique` back onto every original cue.
+class CuePlan:
+    def __init__(self, texts):
+        with span("compact") as attrs:
+            self.source_lengths = [len(t) for t in texts]
+            self.compact_texts, self.markup, saved = compaction.compact(texts)
+            attrs["characters_saved"] = saved
+
+        with span("dedup") as attrs:
+            self.unique, self.positions = dedup.plan(self.compact_texts)
+            attrs["unique_cues"] = len(self.unique)
+
+        self.stats = {
+            "source_chars": sum(len(t) for t in texts),
+            "characters_saved": saved,
+            "unique_cues": len(self.unique),
+            "skipped_cues": len(texts) - len(self.unique),
+            "billed_chars": sum(len(t) for t in self.unique),
+        }
+
+    # Markup characters stripped from cues [start, end), e.g. one file of a batch
+    def characters_saved(self, start: int = 0, end: int = None) -> int:
+        return sum(self.source_lengths[start:end]) - sum(len(t) for t in self.compact_texts[start:end])
+
+    def expand(self, translated_unique):
+        translated = dedup.scatter(translated_unique, self.compact_texts, self.positions)
+        return compaction.restore(translated, self.markup)
+
+
+# Full translation pipeline for a list of cue texts. Identical concurrent
+# requests (same cues, language and profanity mode) share one Azure run.
+# Returns the translated texts and per-request stats. Pass a CuePlan already
+# built for `texts` to reuse it.
+def translate_cues(texts, to_lang, no_prof, user_key=None, weight=1.0, lane=None, checkpoint=None, plan=None):
+    plan = plan or CuePlan(texts)
+
+    translated_unique = []
+    if plan.unique:
+        key = translation_key(plan.unique, to_lang, no_prof)
+        with span("singleflight", key=key[:12]):
+            translated_unique = singleflight.do(
+                key, lambda: detect_and_translate(
+                    plan.unique, to_lang, no_prof, user_key=user_key, weight=weight, lane=lane, checkpoint=checkpoint
+                )
+            )
+
+    stats = dict(plan.stats)
+    if checkpoint is not None:
+        stats["resumed_chunks"] = checkpoint.reused_chunks
+        stats["billed_chars"] -= checkpoint.reused_chars
+    return plan.expand(translated_unique), stats
+
+
+def translated_filename(filename, target_language, censor_profanity):
+    base_name, file_ext = os.path.splitext(filename)
+    tag = " and Censored" if censor_profanity else ""
+    return f"{base_name} (Translated to {target_language.upper()}{tag}){file_ext}"
+
+
+# Parse a .srt or .vtt file; returns the parsed document and its cue texts
+def parse_subtitles(path, file_ext):
+    if file_ext.lower() == ".srt":
+        with open(path, "r", encoding="utf-8") as f:
+            subtitles = list(srt.parse(f.read()))
+        return subtitles, [s.content for s in subtitles]
+    elif file_ext.lower() == ".vtt":
+        vtt = webvtt.read(path)
+        return vtt, [caption.text for caption in vtt.captions]
+    raise ValueError("Unsupported file format. Please upload .srt or .vtt")
+
+
+# Start and end of every cue in milliseconds, in the order parse_subtitles returned their texts
+def cue_timings(document, file_ext):
+    if file_ext.lower() == ".srt":
+        millisecond = timedelta(milliseconds=1)
+        return [s.start // millisecond for s in document], [s.end // millisecond for s in document]
+    return [_vtt_ms(c.start) for c in document.captions], [_vtt_ms(c.end) for c in document.captions]
+
+
+def _vtt_ms(timestamp: str) -> int:
+    seconds = 0.0
+    for part in timestamp.split(":"):
+        seconds = seconds * 60 + float(part)
+    return round(seconds * 1000)
+
+
+def write_subtitles(document, file_ext, translated, output_path):
+    if file_ext.lower() == ".srt":
+        for s, text in zip(document, translated):
+            s.content = text
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(srt.compose(document))
+    else:
+        for caption, text in zip(document.captions, translated):
+            caption.text = text
+        document.save(output_path)
+
+
+# subtitle_files entry for a source file; translations.file_id points at it.
+# storage_path is None when the source isn't kept after translating.
+def original_record(user, filename, file_ext, storage_path, size_bytes):
+    return SubtitleFile(
+        file_id=uuid4(),
+        project_id=None,
+        user_id=user.user_id,
+        original_file_name=filename,
+        storage_path=storage_path,
+        file_format=file_ext.lower().replace(".", ""),
+        file_size_bytes=size_bytes,
+        is_original=True,
+        is_public=False,
+        has_profanity=False,
+        source_language="auto",
+        created_at=datetime.now(timezone.utc)
+    )
+
+
+# Rows recorded before a checkpointed translation starts: the uploaded file and
+# a 'pending' translations entry that its chunk checkpoints hang off
+def pending_translation_records(user, filename, input_path, file_ext, target_language, censor_profanity):
+    original_subtitle = original_record(user, filename, file_ext, input_path, os.path.getsize(input_path))
+    now = original_subtitle.created_at
+    translation = Translation(
+        translation_id=uuid4(),
+        file_id=original_subtitle.file_id,
+        translated_file_id=None,
+        source_language="auto",
+        target_language=target_language,
+        translation_status="pending",
+        translation_service="azure",
+        requested_at=now,
+        completed_at=None,
+        has_profanity=censor_profanity,
+        translation_cost=None,
+        manual_edits_count=0,
+        last_edited_by_user_id=user.user_id,
+        last_edited_at=None
+    )
+    return original_subtitle, translation
+
+
+# Metadata rows for a translated file: subtitle_files entry plus its translations
+# entry. Pass the pending translation to complete it, or the original_record of
+# the source file to create a completed one.
+def translation_records(user, output_filename, output_path, file_ext, target_language, censor_profanity,
+                        translation=None, original=None):
+    now = datetime.now(timezone.utc)
+    translated_subtitle = SubtitleFile(
+        file_id=uuid4(),
+        project_id=None,
+        user_id=user.user_id,
+        original_file_name=output_filename,
+        storage_path=output_path,
+        file_format=file_ext.lower().replace(".", ""),
+        file_size_bytes=os.path.getsize(output_path),
+        is_original=False,
+        is_public=False,
+        has_profanity=censor_profanity,
+        source_language="auto",
+        created_at=now
+    )
+    if translation is not None:
+        translation.translated_file_id = translated_subtitle.file_id
+        translation.translation_status = "completed"
+        translation.completed_at = now
+        return translated_subtitle, translation
+
+    translation = Translation(
+        translation_id=uuid4(),
+        file_id=original.file_id,
+        translated_file_id=translated_subtitle.file_id,
+        source_language="auto",
+        target_language=target_language,
+        translation_status="completed",
+        translation_service="azure",
+        requested_at=now,
+        completed_at=now,
+        has_profanity=censor_profanity,
+        translation_cost=None,
+        manual_edits_count=0,
+        last_edited_by_user_id=user.user_id,
+        last_edited_at=None
+    )
+    return translated_subtitle, translation
+
+
+# Token bucket over translated characters, shared by every request of an AsyncTranslator
+class _CharBudget:
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def take(self, chars: int):
+        chars = min(chars, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= chars:
+                    self.tokens -= chars
+                    return
+                await asyncio.sleep((chars - self.tokens) / self.rate)
+
+
+# Async translator for offline bulk jobs: one connection pool, a cap on
+# concurrent Azure requests and an optional characters-per-minute budget,
+# shared by every file being translated
+class AsyncTranslator:
+    def __init__(self, to_lang, no_prof, max_concurrency=4, chars_per_minute=None, retries=14):
+        self.url = translator_url(to_lang, no_prof)
+        self.retries = retries
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._budget = _CharBudget(chars_per_minute) if chars_per_minute else None
+        self._client = httpx.AsyncClient(headers=translator_headers(), timeout=60)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+
+    async def translate(self, texts):
+        plan = CuePlan(texts)
+        chunks = [chunk for chunk in chunk_texts(plan.unique, MAX_CHAR_LIMIT) if chunk]
+        results = await asyncio.gather(*[self._translate_chunk(chunk) for chunk in chunks])
+        return plan.expand([text for result in results for text in result]), plan.stats
+
+    async def _translate_chunk(self, chunk):
+        async with self._semaphore:
+            for i in range(self.retries):
+                if self._budget:
+                    await self._budget.take(sum(len(t) for t in chunk))
+                response = await self._client.post(self.url, json=[{"Text": t} for t in chunk])
+                if response.status_code == 429:
+                    wait = float(response.headers.get("Retry-After", 5))
+                    print(f"Rate limited. Retrying in {wait} seconds...")
+                    await asyncio.sleep(wait)
+                    continue
+                response.raise_for_status()
+                return [item["translations"][0]["text"] for item in response.json()]
+        raise Exception("Exceeded retry limit for translation request.")
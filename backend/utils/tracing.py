@@ -0,0 +1,239 @@
+import asyncio
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from uuid import uuid4
+
+from config import settings
+
+
+# Trace of the request currently being handled (None outside a traced request)
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+class Trace:
+    def __init__(self, name: str):
+        self.trace_id = uuid4().hex
+        self.name = name
+        self.spans = []
+        self.attrs = {}
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        # Threads and asyncio tasks currently inside one of this trace's spans,
+        # so the profiler can tell this request's samples from other requests'
+        self._owners = Counter()
+        self._owners_lock = threading.Lock()
+
+    def enter(self, owner):
+        with self._owners_lock:
+            self._owners[owner] += 1
+
+    def exit(self, owner):
+        with self._owners_lock:
+            self._owners[owner] -= 1
+            if not self._owners[owner]:
+                del self._owners[owner]
+
+    def owners(self) -> set:
+        with self._owners_lock:
+            return set(self._owners)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    def to_record(self) -> dict:
+        return {
+            "type": "trace",
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "timestamp": self.started_at,
+            "duration_ms": round(self.elapsed_ms(), 3),
+            **self.attrs,
+            "spans": self.spans,
+        }
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def start_trace(name: str):
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    return trace, token
+
+
+def end_trace(token):
+    _current_trace.reset(token)
+
+
+# The asyncio task running this code, or the thread when there is no event loop
+def _owner():
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return threading.get_ident()
+
+
+# Time a stage of the current request; a no-op when no trace is active
+@contextmanager
+def span(name: str, **attrs):
+    trace = _current_trace.get()
+    if trace is None:
+        yield attrs
+        return
+
+    owner = _owner()
+    trace.enter(owner)
+    start = time.perf_counter()
+    record = {"name": name, "start_ms": round((start - trace._start) * 1000, 3)}
+    try:
+        yield attrs
+    except BaseException as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        record.update(attrs)
+        trace.spans.append(record)
+        trace.exit(owner)
+
+
+# Records are written by a background listener thread, so request handlers
+# never wait on the log file. Started lazily in each (forked) process.
+_logger = logging.getLogger("subtitle_translator.trace")
+_logger.propagate = False
+_listener = None
+_listener_pid = None
+
+
+def _trace_logger():
+    global _listener, _listener_pid
+    if _listener_pid != os.getpid():
+        if settings.TRACE_LOG_FILE:
+            handler = logging.FileHandler(settings.TRACE_LOG_FILE, encoding="utf-8")
+        else:
+            handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        records = queue.SimpleQueue()
+        _logger.handlers = [logging.handlers.QueueHandler(records)]
+        _logger.setLevel(logging.INFO)
+        _listener = logging.handlers.QueueListener(records, handler)
+        _listener.start()
+        _listener_pid = os.getpid()
+    return _logger
+
+
+def emit(record: dict):
+    _trace_logger().info(json.dumps(record, default=str))
+
+
+# Write out queued records; call at shutdown
+def flush():
+    global _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+    _listener = None
+    _listener_pid = None
+
+
+# --- Sampling profiler ---
+
+# Samples thread stacks on a background thread and aggregates them in
+# collapsed-stack format ("frame;frame;frame count" per line), which
+# flamegraph.pl, speedscope and inferno all read directly.
+#
+# Without a trace every thread in the process is sampled. With one, only
+# threads inside one of the trace's spans are, and the event loop thread only
+# while one of the trace's tasks is running on it, so concurrent requests
+# don't show up in each other's flamegraphs. Code outside any span is not
+# attributed to the request.
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005, trace: Trace = None):
+        self.interval = interval
+        self.samples = Counter()
+        self.trace = trace
+        self._loop = None
+        self._loop_thread = None
+        if trace is not None:
+            try:
+                self._loop = asyncio.get_running_loop()
+                self._loop_thread = threading.get_ident()
+            except RuntimeError:
+                pass
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            owners = self.trace.owners() if self.trace is not None else None
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if owners is not None and not self._belongs(thread_id, owners):
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                stack.reverse()
+                self.samples[";".join(stack)] += 1
+
+    def _belongs(self, thread_id, owners) -> bool:
+        if thread_id == self._loop_thread:
+            return asyncio.current_task(self._loop) in owners
+        return thread_id in owners
+
+    def dump(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def should_profile(header_value) -> bool:
+    if header_value:
+        if settings.PROFILE_TOKEN:
+            return header_value == settings.PROFILE_TOKEN
+        return settings.DEBUG
+    return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+def save_profile(profiler: SamplingProfiler, trace: Trace) -> str:
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    path = os.path.join(settings.PROFILE_DIR, f"{trace.name.replace('/', '_').strip('_')}-{trace.trace_id}.folded")
+    profiler.dump(path)
+    return path
+
+
+# Stop the profiler and save its profile if the request was slow enough.
+# Blocks on the sampler thread and the profile file, so run it off the event loop.
+def finish_profile(profiler: SamplingProfiler, trace: Trace):
+    profiler.stop()
+    if trace.elapsed_ms() >= settings.PROFILE_SLOW_MS:
+        return save_profile(profiler, trace)
+    return None
@@ -0,0 +1,38 @@
+import io
+import zipfile
+
+
+# Write-only sink that hands back whatever zipfile has written since the last drain
+class _ZipSink(io.RawIOBase):
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+# Yield a ZIP archive of (path, arcname) pairs piece by piece, so neither the
+# archive nor any single file is held in memory in full
+def stream_zip(paths, chunk_size: int = 64 * 1024):
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for path, arcname in paths:
+            with open(path, "rb") as src, zip_file.open(arcname, "w") as dst:
+                while True:
+                    chunk = src.read(chunk_size)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+    yield sink.drain()
@@ -0,0 +1,12 @@
+import os
+import sys
+
+# Backend modules import each other as top-level packages (api, database, ...),
+# the same way they resolve when uvicorn is started from backend/.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+# Placeholder settings so modules that read them at import time can be loaded
+os.environ.setdefault("AZURE_SUBSCRIPTION_KEY", "test-key")
+os.environ.setdefault("AZURE_REGION", "test-region")
+os.environ.setdefault("AZURE_TRANSLATOR_ENDPOINT", "https://api.cognitive.microsofttranslator.com")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
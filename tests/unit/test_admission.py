@@ -0,0 +1,100 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+
+from services.admission import AdmissionController, Overloaded, MAX_UPLOAD_BYTES
+
+
+def test_excess_requests_wait_then_are_rejected():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=0.05, retry_after=7)
+        async with controller.admit(100):
+            # Queue slot available: waits, then times out
+            with pytest.raises(Overloaded) as excinfo:
+                async with controller.admit(100):
+                    pass
+            assert excinfo.value.retry_after == 7
+        assert controller.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_queue_full_rejects_immediately():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=1)
+        release = asyncio.Event()
+
+        async def holder():
+            async with controller.admit(1):
+                await release.wait()
+
+        async def queued():
+            async with controller.admit(1):
+                pass
+
+        tasks = [asyncio.create_task(holder()), asyncio.create_task(queued())]
+        await asyncio.sleep(0.01)
+        assert controller.waiting == 1
+
+        with pytest.raises(Overloaded):
+            async with controller.admit(1):
+                pass
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+
+
+def test_byte_budget_limits_concurrent_uploads():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=10, max_buffered_bytes=1000, queue_timeout=0.05)
+        async with controller.admit(800):
+            with pytest.raises(Overloaded):
+                async with controller.admit(300):
+                    pass
+            async with controller.admit(200):
+                assert controller.buffered_bytes == 1000
+
+        # Oversized uploads still run on an idle worker
+        async with controller.admit(5000):
+            assert controller.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+class _Full:
+    @asynccontextmanager
+    async def admit(self, size):
+        raise Overloaded(7)
+        yield
+
+
+def test_rejections_carry_cors_headers():
+    import main
+
+    origin = {"Origin": "http://localhost:3000"}
+    with TestClient(main.app) as client:
+        main.app.state.admission = _Full()
+        response = client.post("/api/upload-file", content=b"x", headers=origin)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "7"
+        assert response.headers["Access-Control-Allow-Origin"] == "http://localhost:3000"
+        assert "Retry-After" in response.headers["Access-Control-Expose-Headers"]
+
+        too_large = client.post("/api/upload-file", headers={**origin, "Content-Length": str(MAX_UPLOAD_BYTES + 1)})
+        assert too_large.status_code == 413
+        assert too_large.headers["Access-Control-Allow-Origin"] == "http://localhost:3000"
+
+
+def test_retime_uploads_are_admission_controlled():
+    import main
+
+    with TestClient(main.app) as client:
+        too_large = client.post("/api/retime/shift", headers={"Content-Length": str(MAX_UPLOAD_BYTES + 1)})
+        assert too_large.status_code == 413
+
+        main.app.state.admission = _Full()
+        assert client.post("/api/retime/shift", content=b"x").status_code == 503
@@ -0,0 +1,134 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from database.db import SessionLocal, get_engine
+from database.models import SubtitleFile, Translation, TranslationChunk
+from services import translation
+from services.checkpoints import ChunkCheckpoint, expire_pending_translations
+
+
+@pytest.fixture
+def chunk_table():
+    TranslationChunk.__table__.create(get_engine(), checkfirst=True)
+    yield
+    TranslationChunk.__table__.drop(get_engine())
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return [{"translations": [{"text": item["Text"].upper()}]} for item in self.body]
+
+
+def test_checkpoint_round_trip(chunk_table):
+    translation_id = uuid.uuid4()
+    ChunkCheckpoint(translation_id).save(0, ["hello", "bye"], ["bonjour", "salut"])
+
+    checkpoint = ChunkCheckpoint(translation_id)
+    assert len(checkpoint) == 1
+    assert checkpoint.get(0, ["hello", "bye"]) == ["bonjour", "salut"]
+    assert checkpoint.reused_chunks == 1 and checkpoint.reused_chars == 8
+    # Different source texts for the same chunk index are not reused
+    assert checkpoint.get(0, ["hello", "later"]) is None
+    assert checkpoint.get(1, ["hello", "bye"]) is None
+
+    db = SessionLocal()
+    try:
+        checkpoint.clear(db)
+        db.commit()
+    finally:
+        db.close()
+    assert len(ChunkCheckpoint(translation_id)) == 0
+
+
+def test_resume_only_sends_missing_chunks(chunk_table, monkeypatch):
+    sent = []
+    fail_on = [2]
+
+    def fake_post(url, headers, body):
+        sent.append([item["Text"] for item in body])
+        if len(sent) in fail_on:
+            raise RuntimeError("worker restarted")
+        return FakeResponse(body)
+
+    monkeypatch.setattr(translation, "MAX_CHAR_LIMIT", 10)
+    monkeypatch.setattr(translation, "post_with_retries", fake_post)
+    texts = ["aaaaa", "bbbbb", "ccccc", "ddddd", "eeeee"]
+    translation_id = uuid.uuid4()
+
+    with pytest.raises(RuntimeError):
+        translation.detect_and_translate(texts, "fr", False, checkpoint=ChunkCheckpoint(translation_id))
+    assert sent == [["aaaaa", "bbbbb"], ["ccccc", "ddddd"]]
+
+    sent.clear()
+    fail_on.clear()
+    checkpoint = ChunkCheckpoint(translation_id)
+    result = translation.detect_and_translate(texts, "fr", False, checkpoint=checkpoint)
+
+    assert result == ["AAAAA", "BBBBB", "CCCCC", "DDDDD", "EEEEE"]
+    assert sent == [["ccccc", "ddddd"], ["eeeee"]]
+    assert checkpoint.reused_chunks == 1
+
+
+@pytest.fixture
+def translation_tables(chunk_table):
+    tables = [SubtitleFile.__table__, Translation.__table__]
+    for table in tables:
+        table.create(get_engine(), checkfirst=True)
+    yield
+    for table in reversed(tables):
+        table.drop(get_engine())
+
+
+def test_abandoned_pending_translations_expire(translation_tables, tmp_path):
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    ids = {}
+    try:
+        for name, age in (("old", timedelta(days=2)), ("recent", timedelta(minutes=5))):
+            upload = tmp_path / f"upload-{name}.srt"
+            upload.write_text("1\n00:00:01,000 --> 00:00:02,000\nHi\n", encoding="utf-8")
+            original = SubtitleFile(file_id=uuid.uuid4(), user_id=uuid.uuid4(), storage_path=str(upload))
+            pending = Translation(
+                translation_id=uuid.uuid4(), file_id=original.file_id,
+                translation_status="pending", requested_at=now - age,
+            )
+            db.add_all((original, pending))
+            ids[name] = (pending.translation_id, upload)
+        db.commit()
+    finally:
+        db.close()
+    ChunkCheckpoint(ids["old"][0]).save(0, ["Hi"], ["Salut"])
+
+    assert expire_pending_translations(max_age_seconds=3600) == 1
+
+    db = SessionLocal()
+    try:
+        assert db.get(Translation, ids["old"][0]).translation_status == "expired"
+        assert db.get(Translation, ids["recent"][0]).translation_status == "pending"
+    finally:
+        db.close()
+    assert len(ChunkCheckpoint(ids["old"][0])) == 0
+    assert not ids["old"][1].exists()
+    assert ids["recent"][1].exists()
+
+
+def test_completed_translations_point_at_their_original(tmp_path):
+    user = SimpleNamespace(user_id=uuid.uuid4())
+    output = tmp_path / "ep1 (Translated to FR).srt"
+    output.write_text("1\n00:00:01,000 --> 00:00:02,000\nSalut\n", encoding="utf-8")
+
+    original = translation.original_record(user, "ep1.srt", ".srt", None, 42)
+    translated_file, record = translation.translation_records(
+        user, output.name, str(output), ".srt", "fr", False, original=original
+    )
+
+    assert original.is_original and not translated_file.is_original
+    assert record.file_id == original.file_id
+    assert record.translated_file_id == translated_file.file_id
+    assert record.translation_status == "completed"
@@ -0,0 +1,47 @@
+import pytest
+
+import cli
+from database.db import get_engine
+from database.models import User
+
+
+def test_find_subtitles_walks_the_tree(tmp_path):
+    (tmp_path / "season1").mkdir()
+    (tmp_path / "season1" / "ep1.srt").write_text("")
+    (tmp_path / "season1" / "ep2.VTT").write_text("")
+    (tmp_path / "notes.txt").write_text("")
+    (tmp_path / "movie.srt").write_text("")
+
+    assert cli.find_subtitles(str(tmp_path)) == ["movie.srt", "season1/ep1.srt", "season1/ep2.VTT"]
+
+
+def test_manifest_round_trip_and_job_mismatch(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    manifest = cli.load_manifest(path, "fr", False)
+    assert manifest["files"] == {}
+
+    manifest["files"]["ep1.srt"] = {"output": "ep1 (Translated to FR).srt", "recorded": False}
+    cli.save_manifest(path, manifest)
+
+    assert cli.load_manifest(path, "fr", False)["files"] == manifest["files"]
+    with pytest.raises(SystemExit):
+        cli.load_manifest(path, "de", False)
+
+
+def test_worker_errors_are_picklable(tmp_path):
+    bad = tmp_path / "bad.srt"
+    bad.write_text("garbage\n\nnot srt")
+    with pytest.raises(ValueError, match="SRTParseError"):
+        cli._parse_texts(str(bad))
+
+
+def test_unknown_user_fails_before_translating(tmp_path, monkeypatch):
+    User.__table__.create(get_engine(), checkfirst=True)
+    try:
+        (tmp_path / "ep1.srt").write_text("1\n00:00:01,000 --> 00:00:02,000\nHello\n", encoding="utf-8")
+        monkeypatch.setattr(cli, "translate_tree", lambda args, manifest: pytest.fail("translated before checking the user"))
+
+        with pytest.raises(SystemExit, match="nobody@example.com"):
+            cli.main(["translate", str(tmp_path), "--to", "fr", "--user-email", "nobody@example.com"])
+    finally:
+        User.__table__.drop(get_engine())
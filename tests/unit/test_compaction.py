@@ -0,0 +1,52 @@
+from services.compaction import compact, restore
+from services.translation import CuePlan
+
+
+def test_edge_markup_is_stripped_and_restored():
+    texts = [
+        "<i>Hello there</i>",
+        "{\\an8}JOHN: Where are you going?\n- Home.",
+        "<i>Two\nlines</i>",
+        "Plain text",
+    ]
+    compacted, markup, saved = compact(texts)
+
+    assert compacted == ["Hello there", "Where are you going?\nHome.", "Two\nlines", "Plain text"]
+    assert saved == sum(len(t) for t in texts) - sum(len(t) for t in compacted)
+    assert restore(compacted, markup) == texts
+
+
+def test_restore_applies_markup_to_translated_lines():
+    compacted, markup, _ = compact(["{\\an8}JOHN: Where are you going?\n- Home."])
+    assert restore(["Où vas-tu ?\nÀ la maison."], markup) == ["{\\an8}JOHN: Où vas-tu ?\n- À la maison."]
+
+
+def test_reflowed_translation_keeps_outer_markup():
+    compacted, markup, _ = compact(["<i>Two\nlines</i>"])
+    assert restore(["Deux lignes"], markup) == ["<i>Deux lignes</i>"]
+
+
+def test_inner_tags_and_negative_numbers_are_left_alone():
+    texts = ['<font color="#ff0">Yellow</font> and <b>bold</b>', "-5 degrees", "Mr. Smith: hello"]
+    compacted, markup, saved = compact(texts)
+    assert compacted == texts
+    assert saved == 0
+    assert restore(compacted, markup) == texts
+
+
+def test_upper_case_sentence_openers_are_not_speaker_labels():
+    texts = ["OK: let's go", "I SAID: GO AWAY", "NOTE: Bring food", "JOHN: GET OUT!", "- <i>OK: fine</i>"]
+    compacted, markup, _ = compact(texts)
+
+    assert compacted == ["OK: let's go", "I SAID: GO AWAY", "NOTE: Bring food", "JOHN: GET OUT!", "OK: fine"]
+    assert restore(compacted, markup) == texts
+
+
+def test_cue_plan_reports_savings_per_file_slice():
+    first_file = ["<i>Hello</i>", "Plain"]
+    second_file = ["{\\an8}JOHN: Hi"]
+    plan = CuePlan(first_file + second_file)
+
+    assert plan.characters_saved(0, 2) == len("<i></i>")
+    assert plan.characters_saved(2, 3) == len("{\\an8}JOHN: ")
+    assert plan.characters_saved() == plan.stats["characters_saved"]
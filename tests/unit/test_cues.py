@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from services.cues import CueTable
+
+SRT = """1
+00:00:01,000 --> 00:00:02,500
+<i>Hello there</i>
+
+2
+00:00:03,000 --> 00:00:04,000
+Where are you going?
+- Home.
+"""
+
+VTT = """WEBVTT
+Kind: captions
+
+intro
+00:01.000 --> 00:02.000 align:start
+Good morning
+
+01:00:03.000 --> 01:00:04.000
+Bye
+"""
+
+
+def test_srt_round_trip():
+    table = CueTable.parse(SRT)
+    assert list(table.starts) == [1000, 3000]
+    assert list(table.ends) == [2500, 4000]
+    assert table.texts() == ["<i>Hello there</i>", "Where are you going?\n- Home."]
+    assert table.to_srt() == SRT
+
+
+def test_vtt_keeps_header_and_cue_settings():
+    table = CueTable.parse(VTT)
+    assert list(table.starts) == [1000, 3603000]
+    assert table.header == "WEBVTT\nKind: captions"
+    assert table.to_vtt().startswith("WEBVTT\nKind: captions\n\n00:00:01.000 --> 00:00:02.000 align:start\nGood morning\n")
+
+
+def test_shift_clamps_at_zero():
+    table = CueTable.parse(SRT).shift(-1500)
+    assert list(table.starts) == [0, 1500]
+    assert list(table.ends) == [1000, 2500]
+
+
+def test_convert_fps_and_resync():
+    table = CueTable.parse(SRT).convert_fps(25, 23.976)
+    assert list(table.starts) == [round(1000 * 25 / 23.976), round(3000 * 25 / 23.976)]
+
+    table = CueTable.parse(SRT).resync(1000, 11000, 3000, 14000)
+    assert list(table.starts) == [11000, 14000]
+    assert list(table.ends) == [13250, 15500]
+
+    with pytest.raises(ValueError):
+        CueTable.parse(SRT).resync(1000, 0, 1000, 5)
+
+
+def test_repair_sorts_trims_overlaps_and_extends_short_cues():
+    table = CueTable.from_texts(
+        np.array([5000, 0, 1000]), np.array([5100, 1500, 2000]), ["c", "a", "b"]
+    ).repair(min_gap_ms=100, min_duration_ms=1000)
+
+    assert table.texts() == ["a", "b", "c"]
+    assert list(table.starts) == [0, 1000, 5000]
+    assert list(table.ends) == [900, 2000, 6000]
@@ -0,0 +1,19 @@
+from services.dedup import is_untranslatable, plan, scatter
+
+
+def test_untranslatable_cues():
+    for text in ["42", "...", "♪", "♪ ♪", "-", "", "00:01"]:
+        assert is_untranslatable(text)
+    for text in ["[music]", "No!", "Café", "こんにちは"]:
+        assert not is_untranslatable(text)
+
+
+def test_plan_collapses_duplicates_and_scatters_back():
+    texts = ["Yeah.", "♪", "No!", "Yeah.", "42", "No!", "[music]"]
+    unique, positions = plan(texts)
+
+    assert unique == ["Yeah.", "No!", "[music]"]
+    assert positions == [0, None, 1, 0, None, 1, 2]
+
+    translated = ["Ouais.", "Non !", "[musique]"]
+    assert scatter(translated, texts, positions) == ["Ouais.", "♪", "Non !", "Ouais.", "42", "Non !", "[musique]"]
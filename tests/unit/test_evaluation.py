@@ -0,0 +1,65 @@
+from services import evaluation
+from services.cues import CueTable
+
+REFERENCE = """1
+00:00:01,000 --> 00:00:02,000
+<i>Hello there</i>
+
+2
+00:00:03,000 --> 00:00:04,000
+Where are you going?
+"""
+
+
+def test_normalize_and_edit_distance():
+    assert evaluation.normalize("<i>Hello, THERE!</i>") == "hello there"
+    assert evaluation.edit_distance(("a", "b", "c"), ("a", "c")) == 1
+    assert evaluation.edit_distance((), ("a",)) == 1
+    assert evaluation.edit_distance(tuple("kitten"), tuple("sitting")) == 3
+
+
+def test_align_by_timing():
+    ref = CueTable.parse(REFERENCE)
+    hyp = CueTable.from_texts([1100, 3000, 3500, 9000], [1900, 3400, 4000, 9500], ["Hello there", "Where are", "you going?", "Extra"])
+
+    assert evaluation.align(ref, hyp) == [
+        ("", "Extra"),
+        ("<i>Hello there</i>", "Hello there"),
+        ("Where are you going?", "Where are you going?"),
+    ]
+
+
+def test_align_prefers_the_cue_showing_at_the_midpoint():
+    # The next cue starts within the drift tolerance of the short cue's midpoint
+    texts = ["No!", "Where are you going now?"]
+    ref = CueTable.from_texts([0, 700], [600, 3000], texts)
+    hyp = CueTable.from_texts([0, 700], [600, 3000], texts)
+
+    assert evaluation.align(ref, hyp) == [("No!", "No!"), ("Where are you going now?", "Where are you going now?")]
+
+
+def test_align_falls_back_to_the_nearest_cue_within_tolerance():
+    ref = CueTable.from_texts([1000, 3000], [2000, 4000], ["Hello", "Bye"])
+    hyp = CueTable.from_texts([2200, 2700, 5000], [2400, 2900, 5400], ["Hello", "Bye", "Extra"])
+
+    assert evaluation.align(ref, hyp) == [("", "Extra"), ("Hello", "Hello"), ("Bye", "Bye")]
+
+
+def test_run_evaluation_reports_per_engine_and_language(tmp_path):
+    ref_dir = tmp_path / "ref"
+    ref_dir.mkdir()
+    (ref_dir / "ep1.srt").write_text(REFERENCE, encoding="utf-8")
+
+    good = tmp_path / "hyp" / "azure" / "fr"
+    bad = tmp_path / "hyp" / "other" / "fr"
+    good.mkdir(parents=True)
+    bad.mkdir(parents=True)
+    (good / "ep1.srt").write_text(REFERENCE, encoding="utf-8")
+    (bad / "ep1.vtt").write_text("WEBVTT\n\n00:01.000 --> 00:02.000\nHello their\n", encoding="utf-8")
+
+    report = evaluation.run_evaluation(str(ref_dir), str(tmp_path / "hyp"), workers=2)
+
+    assert report["engines"]["azure"]["fr"]["wer"] == 0.0
+    assert report["engines"]["other"]["fr"]["files"] == 1
+    # "their" substitutes one word and all four words of the second cue are missing
+    assert report["engines"]["other"]["fr"]["wer"] == 5 / 6
@@ -0,0 +1,100 @@
+import threading
+import time
+
+from services.scheduler import FairScheduler, INTERACTIVE, BULK
+
+
+def _run_queued(scheduler, jobs):
+    order = []
+
+    def worker(name, user, lane):
+        with scheduler.slot(user, 100, lane=lane):
+            order.append(name)
+
+    # Hold every slot so all jobs queue up before any is granted
+    for _ in range(scheduler.capacity):
+        scheduler.acquire("blocker", 100, lane=INTERACTIVE)
+
+    threads = []
+    for name, user, lane in jobs:
+        t = threading.Thread(target=worker, args=(name, user, lane))
+        t.start()
+        threads.append(t)
+        while sum(v for k, v in scheduler.stats().items() if k.startswith("queued")) < len(threads):
+            time.sleep(0.001)
+
+    for _ in range(scheduler.capacity):
+        scheduler.release()
+    for t in threads:
+        t.join(timeout=5)
+    return order
+
+
+def test_users_are_interleaved_by_fair_share():
+    scheduler = FairScheduler(capacity=1, interactive_reserved=0)
+    order = _run_queued(scheduler, [
+        ("a1", "alice", BULK),
+        ("a2", "alice", BULK),
+        ("a3", "alice", BULK),
+        ("b1", "bob", BULK),
+    ])
+    assert order == ["a1", "b1", "a2", "a3"]
+
+
+def test_interactive_lane_is_served_before_bulk():
+    scheduler = FairScheduler(capacity=1, interactive_reserved=0)
+    order = _run_queued(scheduler, [
+        ("bulk1", "alice", BULK),
+        ("bulk2", "alice", BULK),
+        ("single", "bob", INTERACTIVE),
+    ])
+    assert order == ["single", "bulk1", "bulk2"]
+
+
+def test_bulk_never_takes_reserved_interactive_slots():
+    scheduler = FairScheduler(capacity=2, interactive_reserved=1)
+    scheduler.acquire("alice", 100, lane=BULK)
+
+    granted = threading.Event()
+
+    def second_bulk():
+        with scheduler.slot("alice", 100, lane=BULK):
+            granted.set()
+
+    t = threading.Thread(target=second_bulk)
+    t.start()
+    assert not granted.wait(0.05)
+
+    # The reserved slot is still free for interactive work
+    with scheduler.slot("bob", 100, lane=INTERACTIVE):
+        assert scheduler.stats()["in_flight"] == 2
+
+    scheduler.release()
+    t.join(timeout=5)
+    assert granted.is_set()
+
+
+def test_slots_are_shared_across_workers(tmp_path):
+    # Each scheduler stands in for a separate worker process on the same host
+    worker_a = FairScheduler(capacity=2, interactive_reserved=1, lock_dir=str(tmp_path))
+    worker_b = FairScheduler(capacity=2, interactive_reserved=1, lock_dir=str(tmp_path))
+
+    worker_a.acquire("alice", 100, lane=BULK)
+    started = threading.Event()
+
+    def bulk_on_b():
+        with worker_b.slot("carol", 100, lane=BULK):
+            started.set()
+
+    thread = threading.Thread(target=bulk_on_b)
+    thread.start()
+    # Worker B has free local slots, but the only host-wide bulk slot is taken
+    assert not started.wait(0.2)
+
+    # The reserved slot still lets an interactive job through on worker B
+    with worker_b.slot("bob", 100, lane=INTERACTIVE):
+        pass
+
+    worker_a.release()
+    assert started.wait(2)
+    thread.join(timeout=2)
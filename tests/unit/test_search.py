@@ -0,0 +1,79 @@
+import uuid
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from database.models import SubtitleCue
+
+from services.search import cue_rows, file_cue_rows, format_timestamp, search_statement
+from services.translation import cue_timings, parse_subtitles
+
+SRT = """1
+00:00:01,000 --> 00:00:02,500
+Bonjour
+
+2
+01:02:03,004 --> 01:02:04,000
+Où vas-tu ?
+"""
+
+
+def compiled(statement):
+    return statement.compile(dialect=postgresql.dialect())
+
+
+def test_format_timestamp():
+    assert format_timestamp(0) == "00:00:00,000"
+    assert format_timestamp(3723004) == "01:02:03,004"
+
+
+def test_cue_rows_keep_index_and_timing(tmp_path):
+    path = tmp_path / "ep1 (Translated to FR).srt"
+    path.write_text(SRT, encoding="utf-8")
+    subtitle_file = SimpleNamespace(file_id=uuid.uuid4(), user_id=uuid.uuid4(), storage_path=str(path))
+
+    rows = file_cue_rows(subtitle_file, "fr")
+
+    assert [(r["cue_index"], r["start_ms"], r["end_ms"], r["content"]) for r in rows] == [
+        (0, 1000, 2500, "Bonjour"),
+        (1, 3723004, 3724000, "Où vas-tu ?"),
+    ]
+
+
+def test_rows_are_built_from_the_parsed_document(tmp_path):
+    vtt = tmp_path / "ep1.vtt"
+    vtt.write_text("WEBVTT\n\n00:01.000 --> 00:02.500\nHello\n\n01:02:03.004 --> 01:02:04.000\nWhere?\n", encoding="utf-8")
+    srt_path = tmp_path / "ep1.srt"
+    srt_path.write_text(SRT, encoding="utf-8")
+    subtitle_file = SimpleNamespace(file_id=uuid.uuid4(), user_id=uuid.uuid4())
+
+    for path in (vtt, srt_path):
+        document, _ = parse_subtitles(str(path), path.suffix)
+        starts, ends = cue_timings(document, path.suffix)
+        rows = cue_rows(subtitle_file, "fr", starts, ends, ["Bonjour", "Où vas-tu ?"])
+
+        assert [(r["cue_index"], r["start_ms"], r["end_ms"], r["content"]) for r in rows] == [
+            (0, 1000, 2500, "Bonjour"),
+            (1, 3723004, 3724000, "Où vas-tu ?"),
+        ]
+    assert all(r["file_id"] == subtitle_file.file_id and r["language"] == "fr" for r in rows)
+
+
+def test_search_uses_word_and_trigram_indexes():
+    statement = compiled(search_statement(uuid.uuid4(), "100% sure", limit=20, offset=40, language="fr"))
+    assert "search_vector @@ websearch_to_tsquery" in statement.string
+    assert "content ILIKE" in statement.string
+    assert set(statement.params.values()) >= {"simple", "100% sure", "%100\\% sure%", "fr", 21, 40}
+
+
+def test_short_queries_skip_substring_match():
+    sql = compiled(search_statement(uuid.uuid4(), "ok", limit=20, offset=0)).string
+    assert "@@" in sql
+    assert "ILIKE" not in sql
+
+
+def test_search_indexes_lead_with_the_user():
+    ddl = {i.name: str(CreateIndex(i).compile(dialect=postgresql.dialect())) for i in SubtitleCue.__table__.indexes}
+    assert "USING gin (user_id, search_vector)" in ddl["ix_subtitle_cues_user_search_vector"]
+    assert "USING gin (user_id, content gin_trgm_ops)" in ddl["ix_subtitle_cues_user_content_trgm"]
@@ -0,0 +1,62 @@
+import pytest
+
+import serve
+from database import db
+
+
+@pytest.fixture
+def four_cpus(monkeypatch, tmp_path):
+    monkeypatch.setattr(serve.os, "sched_getaffinity", lambda pid: {0, 1, 2, 3}, raising=False)
+    monkeypatch.setattr(serve, "CGROUP_CPU_MAX", str(tmp_path / "cpu.max"))
+    return tmp_path / "cpu.max"
+
+
+def test_available_cpus_uses_the_affinity_mask_without_a_quota(four_cpus):
+    assert serve.available_cpus() == 4
+
+    four_cpus.write_text("max 100000\n")
+    assert serve.available_cpus() == 4
+
+
+def test_available_cpus_is_capped_by_the_cgroup_quota(four_cpus):
+    four_cpus.write_text("200000 100000\n")
+    assert serve.available_cpus() == 2
+
+    # Fractional quotas round down but never below one CPU
+    four_cpus.write_text("50000 100000\n")
+    assert serve.available_cpus() == 1
+
+    four_cpus.write_text("800000 100000\n")
+    assert serve.available_cpus() == 4
+
+
+def test_worker_count(four_cpus, monkeypatch):
+    monkeypatch.setattr(serve.settings, "WEB_CONCURRENCY", 0)
+    assert serve.worker_count() == 5
+
+    monkeypatch.setattr(serve.settings, "WEB_CONCURRENCY", 3)
+    assert serve.worker_count() == 3
+
+
+def test_pool_settings_split_connections_between_workers(monkeypatch):
+    monkeypatch.setattr(db, "DATABASE_URL", "postgresql://localhost/subtitles")
+    monkeypatch.setattr(db, "DB_MAX_CONNECTIONS", 90)
+    monkeypatch.delenv("DB_POOL_SIZE", raising=False)
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    single = db.pool_settings()
+    assert single["pool_size"] + single["max_overflow"] == 90
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "5")
+    shared = db.pool_settings()
+    assert (shared["pool_size"], shared["max_overflow"]) == (12, 6)
+
+    # Every worker keeps at least two connections, however many there are
+    monkeypatch.setenv("WEB_CONCURRENCY", "200")
+    crowded = db.pool_settings()
+    assert crowded["pool_size"] + crowded["max_overflow"] == 2
+
+
+def test_pool_settings_are_empty_for_sqlite(monkeypatch):
+    monkeypatch.setattr(db, "DATABASE_URL", "sqlite://")
+    assert db.pool_settings() == {}
@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+
+import pytest
+
+from services.singleflight import SingleFlight, translation_key
+
+
+def test_translation_key_depends_on_language_and_profanity_mode():
+    texts = ["Hello", "World"]
+    assert translation_key(texts, "fr", False) == translation_key(list(texts), "fr", False)
+    assert translation_key(texts, "fr", False) != translation_key(texts, "de", False)
+    assert translation_key(texts, "fr", False) != translation_key(texts, "fr", True)
+
+
+def test_concurrent_calls_share_one_execution(tmp_path):
+    flight = SingleFlight(lock_dir=str(tmp_path))
+    calls = []
+    release = threading.Event()
+
+    def translate():
+        calls.append(1)
+        release.wait(5)
+        return ["Bonjour"]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", translate))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    while not calls:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert len(calls) == 1
+    assert results == [["Bonjour"]] * 5
+    assert flight.in_flight() == 0
+
+
+def test_other_workers_reuse_the_leaders_result(tmp_path):
+    first = SingleFlight(lock_dir=str(tmp_path))
+    second = SingleFlight(lock_dir=str(tmp_path))
+
+    assert first.do("k", lambda: ["Hola"]) == ["Hola"]
+    assert second.do("k", lambda: pytest.fail("should reuse the shared result")) == ["Hola"]
+
+
+def test_errors_propagate_and_are_not_cached(tmp_path):
+    flight = SingleFlight(lock_dir=str(tmp_path))
+
+    def fail():
+        raise RuntimeError("Exceeded retry limit")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: ["ok"]) == ["ok"]
+
+
+def test_prune_leaves_files_of_running_calls_alone(tmp_path):
+    # Each instance stands in for a separate worker process sharing the directory
+    leader = SingleFlight(lock_dir=str(tmp_path), result_ttl=1)
+    pruner = SingleFlight(lock_dir=str(tmp_path), result_ttl=1)
+    follower = SingleFlight(lock_dir=str(tmp_path), result_ttl=1)
+
+    # An expired result from long ago
+    path = tmp_path / "k.json"
+    path.write_text('["old"]', encoding="utf-8")
+    os.utime(path, (0, 0))
+
+    calls = []
+    started = threading.Event()
+
+    def translate():
+        calls.append(1)
+        started.set()
+        time.sleep(0.3)
+        return ["Bonjour"]
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(leader.do("k", translate)))
+    thread.start()
+    started.wait(5)
+
+    pruner._prune()
+    assert path.exists()
+    assert follower.do("k", translate) == ["Bonjour"]
+    thread.join(timeout=5)
+
+    assert len(calls) == 1
+    assert results == [["Bonjour"]]
@@ -0,0 +1,91 @@
+import contextvars
+import json
+import threading
+import time
+
+import pytest
+from utils import tracing
+
+
+def test_span_is_noop_without_trace():
+    with tracing.span("stage") as attrs:
+        attrs["cues"] = 3
+    assert tracing.current_trace() is None
+
+
+def test_spans_are_recorded_on_current_trace():
+    trace, token = tracing.start_trace("/api/upload-file")
+    try:
+        with tracing.span("parse", format="srt") as attrs:
+            attrs["cues"] = 12
+        with pytest.raises(ValueError):
+            with tracing.span("translate"):
+                raise ValueError("boom")
+    finally:
+        tracing.end_trace(token)
+
+    record = trace.to_record()
+    assert [s["name"] for s in record["spans"]] == ["parse", "translate"]
+    assert record["spans"][0]["format"] == "srt"
+    assert record["spans"][0]["cues"] == 12
+    assert record["spans"][1]["error"] == "ValueError"
+    assert tracing.current_trace() is None
+
+
+def test_sampling_profiler_writes_collapsed_stacks(tmp_path):
+    profiler = tracing.SamplingProfiler(interval=0.001).start()
+    total = 0
+    for i in range(200000):
+        total += i
+    profiler.stop()
+
+    path = tmp_path / "profile.folded"
+    profiler.dump(str(path))
+    lines = path.read_text().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert ";" in stack
+    assert int(count) > 0
+
+
+def test_emit_writes_through_background_listener(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    tracing.flush()
+    monkeypatch.setattr(tracing.settings, "TRACE_LOG_FILE", str(path))
+    try:
+        tracing.emit({"type": "trace", "trace_id": "abc"})
+    finally:
+        tracing.flush()
+
+    assert json.loads(path.read_text(encoding="utf-8")) == {"type": "trace", "trace_id": "abc"}
+
+
+def test_profiler_only_samples_the_traced_request():
+    trace, token = tracing.start_trace("/api/upload-file")
+    # Worker threads see the request's trace the way run_in_threadpool passes it on
+    context = contextvars.copy_context()
+    tracing.end_trace(token)
+    stop = threading.Event()
+
+    def traced_work():
+        with tracing.span("translate"):
+            while not stop.is_set():
+                sum(range(1000))
+
+    def other_request():
+        while not stop.is_set():
+            sum(range(1000))
+
+    threads = [threading.Thread(target=context.run, args=(traced_work,)), threading.Thread(target=other_request)]
+    for t in threads:
+        t.start()
+    profiler = tracing.SamplingProfiler(interval=0.001, trace=trace).start()
+    time.sleep(0.1)
+    profiler.stop()
+    stop.set()
+    for t in threads:
+        t.join()
+
+    stacks = list(profiler.samples)
+    assert stacks
+    assert all("traced_work" in stack for stack in stacks)
@@ -0,0 +1,19 @@
+import io
+import zipfile
+
+from utils.zipstream import stream_zip
+
+
+def test_stream_zip_produces_a_valid_archive(tmp_path):
+    first = tmp_path / "a.srt"
+    second = tmp_path / "b.vtt"
+    first.write_text("1\n00:00:01,000 --> 00:00:02,000\nHello\n" * 5000, encoding="utf-8")
+    second.write_text("WEBVTT\n", encoding="utf-8")
+
+    pieces = list(stream_zip([(str(first), "a.srt"), (str(second), "b.vtt")], chunk_size=1024))
+    assert len(pieces) > 2
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(pieces)))
+    assert archive.namelist() == ["a.srt", "b.vtt"]
+    assert archive.read("a.srt") == first.read_bytes()
+    assert archive.read("b.vtt") == b"WEBVTT\n"